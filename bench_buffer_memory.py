@@ -0,0 +1,65 @@
+import os
+import sys
+import random
+import tracemalloc
+import pandas as pd
+from rewayat_buffers import SectionBuffer, TextBuffer
+
+NUM_LINES = 200_000
+SPEAKERS = ["دك محمد", "اماني", "ضاري", "طلال", "صالح", "ام فهد", "بو ناصر", "نوره"]
+WORDS = "الي اعرفه انه لج سياره صح انتي روحي لسوق السمك واشري تبينه الله يحفظها".split()
+
+def make_lines(num_lines, seed=0):
+    """Yield fresh (speaker, text) strings, as regex groups in build_jsonl_data would produce"""
+    rng = random.Random(seed)
+    for _ in range(num_lines):
+        speaker = (rng.choice(SPEAKERS) + " ").strip()  # a new str object every time, like match.group(1).strip()
+        text = " ".join(rng.choices(WORDS, k=rng.randint(3, 20)))
+        yield speaker, text
+
+def measure(name, build):
+    """Run `build` under tracemalloc and report the memory it still holds and its peak"""
+    tracemalloc.start()
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<44} held {current / 1e6:8.1f} MB   peak {peak / 1e6:8.1f} MB")
+    return result
+
+def dict_records(num_lines):
+    records = []
+    for line_id, (speaker, text) in enumerate(make_lines(num_lines)):
+        records.append({"line_id": line_id, "file_id": "a1b2c3d4", "speaker": speaker, "text": text})
+    return records
+
+def section_buffer(num_lines):
+    buffer = SectionBuffer("a1b2c3d4")
+    for speaker, text in make_lines(num_lines):
+        buffer.append(speaker, text)
+    return buffer
+
+def string_list_to_tsv(num_lines):
+    texts = [text for _, text in make_lines(num_lines)]
+    with open(os.devnull, "w", encoding="utf-8") as out:
+        pd.DataFrame(texts, columns=["text"]).to_csv(out, index=False, sep='\t', quoting=1)
+    return texts
+
+def text_buffer_to_tsv(num_lines):
+    buffer = TextBuffer()
+    for _, text in make_lines(num_lines):
+        buffer.append(text)
+    with open(os.devnull, "w", encoding="utf-8") as out:
+        buffer.write_tsv(out)
+    return buffer
+
+if __name__ == "__main__":
+    num_lines = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_LINES
+    print(f"{num_lines:,} dialogue lines\n")
+
+    print("build_jsonl_data section records:")
+    measure("list of per-line dicts", lambda: dict_records(num_lines))
+    measure("SectionBuffer", lambda: section_buffer(num_lines))
+
+    print("\nrewayat_hf_preprocessing novel buffer (incl. TSV write):")
+    measure("list of str + pandas DataFrame.to_csv", lambda: string_list_to_tsv(num_lines))
+    measure("TextBuffer.write_tsv", lambda: text_buffer_to_tsv(num_lines))
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import subprocess
+import statistics
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Modules that used to build heavy objects (lingua detector, ChatOpenAI, HF clients) at import time
+MODULES = [
+    "build_jsonl_data",
+    "rewayat_hf_preprocessing",
+    "rewayat_annotation",
+    "rewayat_build_hf_dataset",
+]
+
+REPEATS = 5
+NUM_WORKERS = 4
+
+def time_import(module, repeats=REPEATS):
+    """Return the median wall time (seconds) of `python -c "import <module>"` in a fresh interpreter"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", f"import {module}"],
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def _noop(x):
+    return x
+
+def time_worker_spawn(num_workers=NUM_WORKERS):
+    """Return the wall time (seconds) for a spawn-context pool to run one trivial task per worker"""
+    import build_jsonl_data  # imported in the parent so workers re-import it on spawn
+
+    ctx = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=num_workers, mp_context=ctx) as executor:
+        list(executor.map(build_jsonl_data.short_hash, [str(i) for i in range(num_workers)]))
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    baseline = time_import("os")
+    print(f"{'interpreter baseline':<30} {baseline * 1000:8.1f} ms")
+    for module in MODULES:
+        try:
+            elapsed = time_import(module)
+        except subprocess.CalledProcessError:
+            print(f"{module:<30} {'import failed':>11}")
+            continue
+        print(f"{module:<30} {elapsed * 1000:8.1f} ms  (+{(elapsed - baseline) * 1000:.1f} ms)")
+
+    print(f"\nSpawning {NUM_WORKERS} build_jsonl_data workers: {time_worker_spawn() * 1000:.1f} ms")
@@ -0,0 +1,63 @@
+import os
+import sys
+import glob
+import time
+import pandas as pd
+import pyarrow as pa
+from rewayat_normalization import (
+    CHAR_MAP,
+    REMOVE_CHARS,
+    normalize_text,
+    normalize_series,
+    normalize_arrow,
+)
+
+TSV_FOLDER = "rewayat_tsv"
+SYNTHETIC_ROWS = 500_000
+
+def load_corpus(tsv_folder=TSV_FOLDER):
+    """Load every `text` value of the extracted corpus, or a synthetic corpus if it is not present"""
+    tsv_files = glob.glob(os.path.join(tsv_folder, "*.tsv"))
+    if tsv_files:
+        texts = pd.concat([pd.read_csv(file, sep="\t", usecols=["text"]) for file in tsv_files])["text"]
+        return texts.dropna().astype(str).reset_index(drop=True)
+
+    print(f"No TSV files in {tsv_folder}, using {SYNTHETIC_ROWS:,} synthetic rows")
+    samples = [
+        "دك محمد: الـي اعرفــه انه لج سيارة صح؟؟",
+        "أماني: وُدّي بس الوالدة الله يحفظها تقول لا!!!",
+        "ضاري: صالح‌ تكفى لاتموت، تكفى وربي غصبن عني...",
+        "طلال: انا كنت حاس والحين تأكدت ان انت السبب",
+    ]
+    return pd.Series(samples * (SYNTHETIC_ROWS // len(samples)))
+
+def per_char_loop(text):
+    """Naive per-character normalization, the baseline the vectorized paths replace"""
+    out = []
+    for char in text:
+        if char in REMOVE_CHARS:
+            continue
+        char = CHAR_MAP.get(char, char)
+        if out and char == out[-1] and char in ".!?،؛؟,":
+            continue
+        out.append(char)
+    return " ".join("".join(out).split())
+
+def bench(name, fn, num_rows, num_bytes):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {elapsed:8.2f} s  {num_rows / elapsed:12,.0f} rows/s  {num_bytes / elapsed / 1e6:8.1f} MB/s")
+    return elapsed
+
+if __name__ == "__main__":
+    texts = load_corpus(sys.argv[1] if len(sys.argv) > 1 else TSV_FOLDER)
+    num_rows = len(texts)
+    num_bytes = int(texts.str.len().sum()) * 2  # Arabic letters are 2 bytes in UTF-8
+    arrow_texts = pa.array(texts)
+    print(f"Corpus: {num_rows:,} rows, ~{num_bytes / 1e6:.1f} MB\n")
+
+    bench("per-char Python loop", lambda: [per_char_loop(t) for t in texts], num_rows, num_bytes)
+    bench("normalize_text (map)", lambda: [normalize_text(t) for t in texts], num_rows, num_bytes)
+    bench("normalize_series (pandas)", lambda: normalize_series(texts), num_rows, num_bytes)
+    bench("normalize_arrow (pyarrow)", lambda: normalize_arrow(arrow_texts), num_rows, num_bytes)
@@ -4,16 +4,16 @@ import html
 import re
 import warnings
 import json
-import shortuuid
-from lingua import Language, LanguageDetectorBuilder
 import hashlib
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from rewayat_language import is_arabic
 
 
-languages = [Language.ARABIC]
-detector = LanguageDetectorBuilder.from_languages(*languages).build()
-
 OUTPUT_DIR = "data_rewayat_jsonl"
 REWAYAT_SEARCH_DIR = "rewayat/rewayat-files-pos-segmented-html-cleaned/*"
+NUM_WORKERS = os.cpu_count() or 1
+# rewayat_buffers/rewayat_index pull in pyarrow; workers import them on their first file, not at spawn
 
 def clean_html_entities(text):
     """Convert HTML entities to their proper characters"""
@@ -68,7 +68,12 @@ def has_multiple_punctuation_marks(text):
     return len(punctuation_groups) >= 2
 
 def extract_speaker_paragraphs_with_punctuation(text, file_id):
-    """Extract only paragraphs that contain speaker dialogue with multiple punctuation marks"""
+    """Extract only paragraphs that contain speaker dialogue with multiple punctuation marks
+
+    Returns the SectionBuffers that were written to OUTPUT_DIR.
+    """
+    from rewayat_buffers import SectionBuffer
+
     # First clean HTML entities and process backslashes
     text = clean_html_entities(text)
     text = process_backslashes(text)
@@ -78,22 +83,23 @@ def extract_speaker_paragraphs_with_punctuation(text, file_id):
     
     sections = sections[:10] # limit to 10 sections to speed up the process
     
+    written_sections = []
+    
     
     for section_idx, section in enumerate(sections):
       
-        speaker_paragraphs = []
-        
         file_section_id = f"{file_id}_{section_idx}"
         
         filename_out =  short_hash(file_section_id)
         
+        # line_id is the position in the buffer
+        speaker_paragraphs = SectionBuffer(filename_out)
+        
         if not section.strip():
             continue
             
         paragraphs = section.strip().split('\n\n')
         
-        line_id = 0
-        
         for paragraph in paragraphs:
             paragraph = paragraph.strip()
             if not paragraph:
@@ -120,28 +126,47 @@ def extract_speaker_paragraphs_with_punctuation(text, file_id):
             text_content = dialogue
       
             # Check if dialogue is in Arabic
-            lang_detected = detector.detect_language_of(dialogue)
-            if lang_detected != Language.ARABIC:
+            if not is_arabic(dialogue):
                 continue
             
-            speaker_paragraphs.append({"line_id": line_id, "file_id": filename_out, "speaker": speaker_name, "text": text_content })
-            
-            line_id += 1
+            speaker_paragraphs.append(speaker_name, text_content)
         
         if len(speaker_paragraphs) > 10:
           with open(f"{OUTPUT_DIR}/{filename_out}.jsonl", "w") as f:
-              for item in speaker_paragraphs:
-                  f.write(json.dumps(item) + "\n")
+              speaker_paragraphs.write_jsonl(f)
+          written_sections.append(speaker_paragraphs)
+
+    return written_sections
 
-    return 
+
+def process_file(file):
+    """Extract speaker paragraphs from a single rewayat file (runs in a worker process)"""
+    from rewayat_index import write_index_part
+
+    basename = os.path.basename(file).replace(".txt", "")
+
+    with open(file, 'r') as f:
+        text = f.read()
+
+    sections = extract_speaker_paragraphs_with_punctuation(text, basename)
+
+    # Side output: speaker/token postings of the written sections, merged by build_index
+    write_index_part(sections, basename)
 
 
 if __name__ == "__main__":
+    from rewayat_index import INDEX_PARTS_DIR, build_index
+
     os.makedirs(OUTPUT_DIR, exist_ok=True)
-    for file in glob.glob(REWAYAT_SEARCH_DIR):
-        basename = os.path.basename(file).replace(".txt", "")
+    files = glob.glob(REWAYAT_SEARCH_DIR)
+
+    # Parts left by an earlier run may belong to novels that are no longer in the input
+    shutil.rmtree(INDEX_PARTS_DIR, ignore_errors=True)
+
+    # Each worker builds its own detector lazily on the first file it handles
+    with ProcessPoolExecutor(max_workers=NUM_WORKERS) as executor:
+        for _ in executor.map(process_file, files, chunksize=16):
+            pass
 
-        with open(file, 'r') as f:
-            text = f.read()
+    build_index()
 
-        extract_speaker_paragraphs_with_punctuation(text, basename)
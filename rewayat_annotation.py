@@ -4,46 +4,69 @@ import json
 import random
 from typing import List, Dict, Any
 from collections import defaultdict
-import tqdm
 import glob
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# OpenAI SDK v1.x
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_core.prompts.chat import (
-    ChatPromptTemplate,
-    HumanMessagePromptTemplate,
-    SystemMessagePromptTemplate,
-)
-from langchain_core.output_parsers import JsonOutputParser
-from langchain_openai import ChatOpenAI
-import os
-from dotenv import load_dotenv
+# --- Config ---
+DEFAULT_BASE_URL = "http://10.127.7.212:8000/v1"
+DEFAULT_MODEL    = "openai/gpt-oss-120b"
+OUTPUT_ROOT      = "output_data"
+WORKERS_PER_ENDPOINT = 4
 
-os.environ["VLLM_MODEL_NAME"] = "openai/gpt-oss-120b"
-load_dotenv()
+# langchain/openai clients are heavy to import and build, so they are created on first use
+_config = None
+_pool = None
+_pool_lock = threading.Lock()
 
-# --- Config ---
-BASE_URL = os.getenv("OPENAI_BASE_URL", "http://10.127.7.212:8000/v1")
-API_KEY  = os.getenv("OPENAI_API_KEY", "EMPTY")  # vLLM doesn't check this
-MODEL    = os.getenv("VLLM_MODEL_NAME", "openai/gpt-oss-120b")
+def get_config() -> Dict[str, Any]:
+    """
+    Load .env once and return the client configuration (base_urls, api_key, model)
+
+    OPENAI_BASE_URLS takes a comma-separated list of vLLM replicas; OPENAI_BASE_URL
+    (a single server) is still honoured when it is not set.
+    """
+    global _config
+    if _config is None:
+        from dotenv import load_dotenv
+        load_dotenv()
+        base_urls = os.getenv("OPENAI_BASE_URLS") or os.getenv("OPENAI_BASE_URL", DEFAULT_BASE_URL)
+        _config = {
+            "base_urls": [url.strip() for url in base_urls.split(",") if url.strip()],
+            "api_key": os.getenv("OPENAI_API_KEY", "EMPTY"),  # vLLM doesn't check this
+            "model": os.getenv("VLLM_MODEL_NAME", DEFAULT_MODEL),
+        }
+    return _config
 
-llm = ChatOpenAI(
-    model=MODEL,
-    openai_api_key=API_KEY,
-    openai_api_base=BASE_URL,
-    max_tokens=120000,
-    temperature=0.6,
-)
+def output_dir(model: str = None) -> str:
+    """Annotations are written per model, e.g. output_data/gpt-oss-120b for the default model"""
+    model = model or get_config()["model"]
+    return os.path.join(OUTPUT_ROOT, model.split("/")[-1])
 
-# Create JSON output parser
-json_parser = JsonOutputParser()
+def get_pool():
+    """Return the EndpointPool over all configured servers, building it on first call"""
+    global _pool
+    # process_file runs in a thread pool, so guard against building the clients twice
+    with _pool_lock:
+        if _pool is None:
+            from rewayat_endpoint_pool import EndpointPool
 
-llm_json= llm | json_parser
+            config = get_config()
+            _pool = EndpointPool(
+                config["base_urls"],
+                model=config["model"],
+                api_key=config["api_key"],
+                max_connections=WORKERS_PER_ENDPOINT,
+                max_tokens=120000,
+                temperature=0.6,
+            )
+    return _pool
 
 def dialogues_semantic_split(
     dialogues_str: str
 ) -> str:
+    from langchain_core.messages import HumanMessage, SystemMessage
+
     messages = [
       SystemMessage(
         content="You are a helpful assistant and Gulf dialect native speaker."
@@ -72,7 +95,10 @@ def dialogues_semantic_split(
 """
       )
     ]
-    res = llm_json.invoke(messages)
+    # Parsing happens outside the pool so malformed model output does not count against the server
+    from langchain_core.output_parsers import JsonOutputParser
+
+    res = JsonOutputParser().invoke(get_pool().invoke(messages))
     return res
 
 def process_file(filepath: str) -> None:
@@ -80,7 +106,7 @@ def process_file(filepath: str) -> None:
     filename = os.path.basename(filepath)
     
     
-    output_file_path = os.path.join("output_data/gpt-oss-120b", filename + '.jsonl')
+    output_file_path = os.path.join(output_dir(), filename + '.jsonl')
     
     if os.path.exists(output_file_path):
         return
@@ -102,8 +128,11 @@ def process_file(filepath: str) -> None:
         print(f"Error processing {filename}: {e}")
 
 if __name__ == "__main__":
-    print(f"Using base_url={BASE_URL}, model={MODEL}")
-    os.makedirs("output_data/gpt-oss-120b", exist_ok=True)
+    import tqdm
+
+    config = get_config()
+    print(f"Using base_urls={config['base_urls']}, model={config['model']}, output_dir={output_dir()}")
+    os.makedirs(output_dir(), exist_ok=True)
     
     files = glob.glob("data_rewayat_jsonl/*.jsonl")
     
@@ -115,8 +144,8 @@ if __name__ == "__main__":
     
     files = list(sorted(files)) 
     
-    # Process files in parallel with 4 workers
-    with ThreadPoolExecutor(max_workers=4) as executor:
+    # Process files in parallel with 4 workers per server
+    with ThreadPoolExecutor(max_workers=WORKERS_PER_ENDPOINT * len(config["base_urls"])) as executor:
         # Submit all tasks
         future_to_file = {executor.submit(process_file, filepath): filepath for filepath in files}
         
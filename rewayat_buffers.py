@@ -0,0 +1,102 @@
+import json
+from array import array
+import pyarrow as pa
+
+class TextBuffer:
+    """
+    Append-only buffer of text lines stored as one UTF-8 blob plus end offsets
+
+    Replaces a list of Python strings: each line costs 4 bytes of offset instead
+    of a ~75-byte str header, and the blob maps directly onto an Arrow string
+    array. A line's line_id is its position in the buffer.
+    """
+
+    def __init__(self):
+        self._blob = bytearray()
+        self._offsets = array("i", [0])  # int32, the layout of an Arrow string array
+
+    def append(self, text):
+        self._blob += text.encode("utf-8")
+        self._offsets.append(len(self._blob))
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def text(self, line_id):
+        return self._blob[self._offsets[line_id]:self._offsets[line_id + 1]].decode("utf-8")
+
+    def iter_texts(self):
+        blob, offsets = self._blob, self._offsets
+        for i in range(len(self)):
+            yield blob[offsets[i]:offsets[i + 1]].decode("utf-8")
+
+    def write_tsv(self, f):
+        """Write a one-column "text" TSV, byte-identical to pandas to_csv(sep='\\t', quoting=QUOTE_ALL, index=False)"""
+        f.write('"text"\n')
+        for text in self.iter_texts():
+            f.write('"' + text.replace('"', '""') + '"\n')
+
+    def _text_array(self):
+        """Zero-copy Arrow view of the blob (the buffer cannot grow while the view is alive)"""
+        return pa.Array.from_buffers(pa.string(), len(self), [None, pa.py_buffer(self._offsets), pa.py_buffer(self._blob)])
+
+    def to_arrow(self):
+        """Return the lines as a pyarrow Table with a single "text" column"""
+        return pa.table({"text": self._text_array()})
+
+class SectionBuffer(TextBuffer):
+    """
+    Dialogue lines of one section: a shared file_id, interned speakers and a text blob
+
+    Replaces the per-line {"line_id", "file_id", "speaker", "text"} dicts of
+    build_jsonl_data. Speakers are stored once and referenced by a 4-byte index.
+    """
+
+    def __init__(self, file_id):
+        super().__init__()
+        self.file_id = file_id
+        self.speakers = []  # interned speaker names, in order of first appearance
+        self._speaker_index = {}
+        self._speaker_ids = array("i")
+
+    def append(self, speaker, text):
+        speaker_id = self._speaker_index.get(speaker)
+        if speaker_id is None:
+            speaker_id = self._speaker_index[speaker] = len(self.speakers)
+            self.speakers.append(speaker)
+        self._speaker_ids.append(speaker_id)
+        super().append(text)
+
+    def speaker(self, line_id):
+        return self.speakers[self._speaker_ids[line_id]]
+
+    def write_jsonl(self, f):
+        """Write one JSON object per line, byte-identical to json.dumps of the former per-line dicts"""
+        # JSON fragments for the file id and every speaker are encoded once, not once per line
+        file_id_json = json.dumps(self.file_id)
+        speakers_json = [json.dumps(speaker) for speaker in self.speakers]
+        for line_id, (speaker_id, text) in enumerate(zip(self._speaker_ids, self.iter_texts())):
+            f.write(
+                f'{{"line_id": {line_id}, "file_id": {file_id_json}, '
+                f'"speaker": {speakers_json[speaker_id]}, "text": {json.dumps(text)}}}\n'
+            )
+
+    def write_tsv(self, f):
+        """Write line_id/file_id/speaker/text as a quoted TSV"""
+        file_id = self.file_id.replace('"', '""')
+        speakers = [speaker.replace('"', '""') for speaker in self.speakers]
+        f.write('"line_id"\t"file_id"\t"speaker"\t"text"\n')
+        for line_id, (speaker_id, text) in enumerate(zip(self._speaker_ids, self.iter_texts())):
+            f.write(f'"{line_id}"\t"{file_id}"\t"{speakers[speaker_id]}"\t"' + text.replace('"', '""') + '"\n')
+
+    def to_arrow(self):
+        """Return the section as a pyarrow Table (line_id, file_id, speaker, text); speakers stay dictionary-encoded"""
+        num_lines = len(self)
+        file_ids = pa.Array.from_buffers(pa.int32(), num_lines, [None, pa.py_buffer(bytes(4 * num_lines))])
+        speaker_ids = pa.Array.from_buffers(pa.int32(), num_lines, [None, pa.py_buffer(self._speaker_ids)])
+        return pa.table({
+            "line_id": pa.array(range(num_lines), type=pa.int64()),
+            "file_id": pa.DictionaryArray.from_arrays(file_ids, pa.array([self.file_id], type=pa.string())),
+            "speaker": pa.DictionaryArray.from_arrays(speaker_ids, pa.array(self.speakers, type=pa.string())),
+            "text": self._text_array(),
+        })
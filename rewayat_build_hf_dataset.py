@@ -1,11 +1,9 @@
 import os
-import pandas as pd
-from datasets import Dataset, DatasetDict
-from huggingface_hub import login, HfApi
-from dotenv import load_dotenv
 import glob
+from rewayat_annotation import output_dir as annotation_output_dir
 
-load_dotenv()
+# pandas, datasets, huggingface_hub and the Arrow-based rewayat_* modules are imported
+# inside the functions that need them so that `import rewayat_build_hf_dataset` stays cheap
 
 def load_and_combine_tsvs(tsv_folder_path, pattern="*.tsv"):
     """
@@ -18,6 +16,8 @@ def load_and_combine_tsvs(tsv_folder_path, pattern="*.tsv"):
     Returns:
         pd.DataFrame: Combined dataframe
     """
+    import pandas as pd
+
     tsv_files = glob.glob(os.path.join(tsv_folder_path, pattern))
     
     if not tsv_files:
@@ -36,7 +36,7 @@ def load_and_combine_tsvs(tsv_folder_path, pattern="*.tsv"):
     
     return combined_df
 
-def create_train_valid_split(df, valid_ratio=1/1000, random_state=42):
+def create_train_valid_split(df, valid_ratio=1/1000, random_state=42, by_hash=False):
     """
     Create train/validation split for the dataset with 1000:1 ratio
     
@@ -44,13 +44,26 @@ def create_train_valid_split(df, valid_ratio=1/1000, random_state=42):
         df (pd.DataFrame): Input dataframe
         valid_ratio (float): Proportion for validation set (1/1000 = 0.001)
         random_state (int): Random seed
+        by_hash (bool): Assign rows by a hash of their text instead of a random shuffle,
+            so a row stays in the same split when the corpus grows
     
     Returns:
         DatasetDict: Dictionary with train/valid splits
     """
+    import pandas as pd
     from sklearn.model_selection import train_test_split
+    from datasets import Dataset, DatasetDict
     
-    train_df, valid_df = train_test_split(df, test_size=valid_ratio, random_state=random_state)
+    if by_hash:
+        buckets = pd.util.hash_pandas_object(df['text'], index=False) % 1_000_000
+        is_valid = buckets < valid_ratio * 1_000_000
+        if not is_valid.any() and len(df) > 1:
+            # Small corpora may have no row under the threshold; like train_test_split,
+            # keep at least one validation row (the smallest bucket, still stable)
+            is_valid = buckets == buckets.min()
+        train_df, valid_df = df[~is_valid], df[is_valid]
+    else:
+        train_df, valid_df = train_test_split(df, test_size=valid_ratio, random_state=random_state)
     
     # Convert to Hugging Face datasets
     train_dataset = Dataset.from_pandas(train_df)
@@ -63,44 +76,77 @@ def create_train_valid_split(df, valid_ratio=1/1000, random_state=42):
     
     return dataset_dict
 
-def create_dataset_from_tsvs(tsv_folder_path, split_data=True):
+def create_dataset_from_tsvs(tsv_folder_path, split_data=True, by_hash=False):
     """
     Create Hugging Face dataset from TSV files
     
     Args:
         tsv_folder_path (str): Path to TSV files
         split_data (bool): Whether to create train/validation split
+        by_hash (bool): Use a stable hash-based split (see create_train_valid_split)
     
     Returns:
         Dataset or DatasetDict: Processed dataset
     """
+    from datasets import Dataset
+    from rewayat_normalization import add_normalized_column
+
     # Load and combine TSVs
     combined_df = load_and_combine_tsvs(tsv_folder_path)
     
     # Clean data (customize as needed)
     print("Cleaning data...")
     combined_df = combined_df.dropna()  # Remove null values
-    combined_df = combined_df.drop_duplicates()  # Remove duplicates
+    print("Normalizing text...")
+    combined_df = add_normalized_column(combined_df)  # Keeps raw `text`, adds `text_normalized`
+    # Remove duplicates, comparing normalized text so diacritic/tatweel variants collapse
+    combined_df = combined_df.drop_duplicates(subset=["text_normalized", "source_file"])
     
     if split_data:
-        return create_train_valid_split(combined_df)
+        return create_train_valid_split(combined_df, by_hash=by_hash)
     else:
         return Dataset.from_pandas(combined_df)
 
-def publish_to_huggingface(dataset, repo_name, description="", private=False, token=None):
+def publish_to_huggingface(dataset, repo_name, description="", private=False, token=None,
+                           staging_dir=None, target=None, extra_configs=None):
     """
     Publish dataset to Hugging Face Hub
     
+    The dataset is exported to Parquet shards in `staging_dir` first, then only the
+    shards whose sha256 differs from the copy in the repository are uploaded, so a
+    failed publish can simply be rerun and a slightly grown corpus uploads few shards.
+    
     Args:
         dataset: Dataset or DatasetDict to publish
         repo_name (str): Repository name (username/dataset-name)
         description (str): Dataset description
         private (bool): Whether repository should be private
         token (str): Hugging Face token (optional if logged in)
+        staging_dir (str): Local directory for the Parquet shards and dataset card
+            (defaults to rewayat_hub_export.STAGING_DIR)
+        target: Upload target (defaults to HubTarget(repo_name); LocalDirTarget for dry runs)
+        extra_configs (dict): Additional Hub configs, config name -> Dataset/DatasetDict or
+            {split: pa.Table}, e.g. {"topics": {"train": build_topic_table()}}. Their rows
+            are grouped into shards by file_id.
     
     Returns:
         str: Repository URL
     """
+    from datasets import Dataset
+    from huggingface_hub import login
+    from rewayat_card_stats import format_stats_markdown, speaker_counts_from_staging, stats_from_staging
+    from rewayat_hub_export import (
+        DEFAULT_CONFIG,
+        STAGING_DIR,
+        HubTarget,
+        config_data_dir,
+        export_parquet_shards,
+        prune_configs,
+        upload_shards,
+    )
+
+    staging_dir = staging_dir or STAGING_DIR
+
     # Login if token provided
     if token:
         login(token=token)
@@ -109,20 +155,59 @@ def publish_to_huggingface(dataset, repo_name, description="", private=False, to
     print(f"Publishing dataset to {repo_name}...")
     
     try:
-        dataset.push_to_hub(
-            repo_id=repo_name,
-            private=private
-        )
+        if target is None:
+            target = HubTarget(repo_name, private=private, token=token)
+
+        prune_configs(staging_dir, {DEFAULT_CONFIG, *(extra_configs or {})})
+        manifest = export_parquet_shards(dataset, staging_dir)
+        for config_name, config_dataset in (extra_configs or {}).items():
+            manifest = export_parquet_shards(config_dataset, staging_dir, key="file_id", config_name=config_name)
+        upload_stats = upload_shards(staging_dir, target)
+        print(f"Uploaded {upload_stats['uploaded']} shards, skipped {upload_stats['skipped']}, deleted {upload_stats['deleted']}")
         
         # Add dataset card (README.md) with metadata
-        api = HfApi()
-        # Calculate dataset statistics
+        config_splits = {}
+        for entry in manifest["shards"].values():
+            config_splits.setdefault(entry.get("config", DEFAULT_CONFIG), set()).add(entry["split"])
+        # The default config comes first so that load_dataset(repo_name) picks it
+        configs_yaml = "\n".join(
+            f"- config_name: {config_name}\n  data_files:\n" + "\n".join(
+                f"  - split: {split}\n    path: {config_data_dir(config_name)}/{split}-*.parquet"
+                for split in sorted(config_splits[config_name])
+            )
+            for config_name in sorted(config_splits, key=lambda name: (name != DEFAULT_CONFIG, name))
+        )
+        extra_config_names = [name for name in sorted(config_splits) if name != DEFAULT_CONFIG]
+        extra_configs_section = "\nAdditional configs:\n\n" + "".join(
+            f"""- `load_dataset("{repo_name}", "{config_name}")`\n""" for config_name in extra_config_names
+        ) if extra_config_names else ""
+        topics_fields = """
+### `topics` config
+
+Dialogue lines grouped into topic segments by `rewayat_annotation` and joined back by `rewayat_topic_join`:
+
+- **file_id**: Dialogue section id (file name in `data_rewayat_jsonl`)
+- **split_id**: Position of the topic segment within the section
+- **topic**: Short topic description in Modern Standard Arabic
+- **line_ids**, **speakers**, **texts**: Lines of the segment, in model order
+- **dialogue**: The segment as `speaker: text` lines
+- **num_lines**: Number of lines in the segment
+""" if "topics" in config_splits else ""
+        # Calculate dataset statistics in one streaming pass over the staged shards
+        card_stats = stats_from_staging(staging_dir)
+        if not card_stats["total"]["speakers"] and "topics" in config_splits:
+            # The default config has no speaker column; the topics config keeps one per line
+            card_stats["total"]["speakers"] = speaker_counts_from_staging(staging_dir, "topics")
+            card_stats["speakers_source"] = "the annotated lines of the `topics` config"
+        total_samples = card_stats["total"]["num_rows"]
+        split_counts = ", ".join(
+            f"{split} ({split_stats['num_rows']:,})" for split, split_stats in card_stats["splits"].items()
+        )
         if isinstance(dataset, Dataset):
-            total_samples = len(dataset)
             features = list(dataset.features.keys())
         else:
-            total_samples = sum(len(split) for split in dataset.values())
             features = list(next(iter(dataset.values())).features.keys())
+        features = [name for name in features if not name.startswith("__index_level_")]
             
         dataset_card = f"""---
 license: mit
@@ -131,7 +216,9 @@ task_categories:
 language:
 - ar
 size_categories:
-- 1K<n<10K
+- {card_stats["size_category"]}
+configs:
+{configs_yaml}
 ---
 
 # {repo_name.split('/')[-1]}
@@ -142,10 +229,11 @@ size_categories:
 
 This dataset was created from multiple TSV files and contains Arabic text fragments with the following information:
 
-- **Total samples**: {total_samples}
+- **Total samples**: {total_samples:,}
 - **Features**: {list(features)}
-- **Splits**: train, validation (1000:1 ratio)
+- **Splits**: {split_counts}
 
+{format_stats_markdown(card_stats)}
 ## Usage
 
 ```python
@@ -159,23 +247,22 @@ train_data = dataset['train']
 # Access validation split  
 validation_data = dataset['validation']
 ```
-
+{extra_configs_section}
 ## Data Fields
 
 - **text**: Arabic text fragments with multiple punctuation marks
+- **text_normalized**: `text` without tatweel, diacritics and zero-width characters, with unified alef/yeh/teh marbuta forms and collapsed repeated punctuation
 - **source_file**: Original source file name
-
+{topics_fields}
 ## Citation
 
 If you use this dataset, please cite it appropriately.
 """
         
-        api.upload_file(
-            path_or_fileobj=dataset_card.encode(),
-            path_in_repo="README.md",
-            repo_id=repo_name,
-            repo_type="dataset"
-        )
+        card_path = os.path.join(staging_dir, "README.md")
+        with open(card_path, "w", encoding="utf-8") as f:
+            f.write(dataset_card)
+        target.commit([(card_path, "README.md")], [], "Update dataset card")
         
         repo_url = f"https://huggingface.co/datasets/{repo_name}"
         print(f"Dataset published successfully: {repo_url}")
@@ -190,6 +277,11 @@ def main():
     """
     Main function to create and publish dataset with train/validation splits
     """
+    from dotenv import load_dotenv
+    from rewayat_topic_join import build_topic_table
+
+    load_dotenv()
+
     # Configuration
     TSV_FOLDER = "rewayat_tsv"  # Update this path
     REPO_NAME = "lliryc/rewayat"  # Update this
@@ -198,7 +290,8 @@ def main():
     
     # Step 1: Create dataset from TSVs with train/validation splits
     print("Creating dataset from TSV files with train/validation splits...")
-    dataset = create_dataset_from_tsvs(TSV_FOLDER, split_data=True)
+    # Hash-based split keeps rows in their split across publishes, so unchanged shards are not re-uploaded
+    dataset = create_dataset_from_tsvs(TSV_FOLDER, split_data=True, by_hash=True)
     
     # Step 2: Preview dataset
     print("\nDataset preview:")
@@ -206,18 +299,31 @@ def main():
     print(f"Validation samples: {len(dataset['validation'])}")
     print(f"Total samples: {len(dataset['train']) + len(dataset['validation'])}")
     print(f"Features: {list(dataset['train'].features.keys())}")
-    print("\nSample train data:")
-    print(dataset['train'][0])
-    print("\nSample validation data:")
-    print(dataset['validation'][0])
+    if len(dataset['train']):
+        print("\nSample train data:")
+        print(dataset['train'][0])
+    if len(dataset['validation']):
+        print("\nSample validation data:")
+        print(dataset['validation'][0])
+    
+    # Step 3: Join topic segments from rewayat_annotation back to their dialogue lines
+    # rewayat_annotation writes one directory per model (VLLM_MODEL_NAME)
+    extra_configs = {}
+    annotation_dir = annotation_output_dir()
+    if glob.glob(os.path.join(annotation_dir, "*.jsonl")):
+        print(f"\nJoining topic annotations from {annotation_dir}...")
+        extra_configs["topics"] = {"train": build_topic_table(annotation_dir)}
+    else:
+        print(f"\nNo topic annotations in {annotation_dir}; publishing without the topics config")
     
-    # Step 3: Publish to Hugging Face
+    # Step 4: Publish to Hugging Face
     repo_url = publish_to_huggingface(
         dataset=dataset,
         repo_name=REPO_NAME,
         description=DESCRIPTION,
         private=True,  # Set to True for private dataset
-        token=HF_TOKEN
+        token=HF_TOKEN,
+        extra_configs=extra_configs
     )
     
     print(f"\n✅ Dataset successfully published at: {repo_url}")
@@ -227,6 +333,7 @@ def example_usage():
     """
     Example usage patterns
     """
+    from datasets import Dataset
     
     # Example 1: Simple dataset without train/test split
     df = load_and_combine_tsvs("rewayat_tsv", "*.tsv")
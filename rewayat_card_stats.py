@@ -0,0 +1,203 @@
+import os
+from collections import Counter
+import numpy as np
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from rewayat_hub_export import load_manifest
+
+BATCH_SIZE = 64 * 1024
+TEXT_LENGTH_BINS = [0, 16, 32, 64, 128, 256, 512, 1024]  # characters; the last bin is open-ended
+TOP_K = 10
+
+# Punctuation used by has_multiple_punctuation_marks (build_jsonl_data); a run of adjacent marks counts once
+PUNCTUATION_RUN = r"[.!?،؛؟]+"
+ARABIC_PUNCTUATION = r"[،؛؟]"
+
+# Frequent Gulf dialect function words vs their Modern Standard Arabic counterparts.
+# RE2 has no Unicode word boundaries, so words are delimited by whitespace/punctuation explicitly.
+GULF_MARKERS = ["شلون", "وايد", "الحين", "ابي", "أبي", "يبي", "تبي", "جذي", "چذي", "هني", "مب", "شنو", "ليش", "زين"]
+MSA_MARKERS = ["سوف", "لماذا", "ليس", "هكذا", "هنا", "الآن", "أريد", "كيف", "ماذا", "جدا"]
+
+# https://huggingface.co/docs/hub/datasets-cards size_categories values
+SIZE_CATEGORIES = [
+    (1_000, "n<1K"),
+    (10_000, "1K<n<10K"),
+    (100_000, "10K<n<100K"),
+    (1_000_000, "100K<n<1M"),
+    (10_000_000, "1M<n<10M"),
+    (100_000_000, "10M<n<100M"),
+    (1_000_000_000, "100M<n<1B"),
+    (10_000_000_000, "1B<n<10B"),
+    (100_000_000_000, "10B<n<100B"),
+    (1_000_000_000_000, "100B<n<1T"),
+]
+
+def _word_regex(words):
+    """Regex matching any of `words` as a whole word in Arabic text"""
+    return r"(^|[\s.!?،؛؟,:\"'])(" + "|".join(words) + r")($|[\s.!?،؛؟,:\"'])"
+
+def size_category(num_rows):
+    """Return the Hugging Face size_categories value for a row count"""
+    for upper, category in SIZE_CATEGORIES:
+        if num_rows < upper:
+            return category
+    return "n>1T"
+
+def _new_split_stats():
+    return {
+        "num_rows": 0,
+        "text_chars": 0,
+        "text_length_min": None,
+        "text_length_max": 0,
+        "text_length_histogram": np.zeros(len(TEXT_LENGTH_BINS), dtype=np.int64),
+        "multiple_punctuation": 0,
+        "arabic_punctuation": 0,
+        "gulf_markers": 0,
+        "msa_markers": 0,
+        "speakers": Counter(),
+        "source_files": Counter(),
+    }
+
+def _update_split_stats(stats, batch, text_column):
+    """Fold one Arrow record batch into the running statistics of a split (vectorized)"""
+    text = batch.column(text_column)
+    stats["num_rows"] += batch.num_rows
+
+    lengths = pc.utf8_length(text).to_numpy(zero_copy_only=False)
+    if len(lengths):
+        stats["text_chars"] += int(lengths.sum())
+        stats["text_length_max"] = max(stats["text_length_max"], int(lengths.max()))
+        batch_min = int(lengths.min())
+        stats["text_length_min"] = batch_min if stats["text_length_min"] is None else min(stats["text_length_min"], batch_min)
+        bins = np.digitize(lengths, TEXT_LENGTH_BINS[1:])
+        stats["text_length_histogram"] += np.bincount(bins, minlength=len(TEXT_LENGTH_BINS))
+
+    def count_true(mask):
+        return int(pc.sum(mask).as_py() or 0)
+
+    stats["multiple_punctuation"] += count_true(pc.greater_equal(pc.count_substring_regex(text, PUNCTUATION_RUN), 2))
+    stats["arabic_punctuation"] += count_true(pc.match_substring_regex(text, ARABIC_PUNCTUATION))
+    stats["gulf_markers"] += count_true(pc.match_substring_regex(text, _word_regex(GULF_MARKERS)))
+    stats["msa_markers"] += count_true(pc.match_substring_regex(text, _word_regex(MSA_MARKERS)))
+
+    for column, counter in (("speaker", stats["speakers"]), ("source_file", stats["source_files"])):
+        if column in batch.schema.names:
+            values, counts = pc.value_counts(batch.column(column)).flatten()
+            counter.update(dict(zip(values.to_pylist(), counts.to_pylist())))
+
+def compute_stats(batches_by_split, text_column="text"):
+    """
+    Compute dataset card statistics in a single pass over Arrow record batches
+
+    Args:
+        batches_by_split (dict): Split name -> iterable of pyarrow RecordBatches
+        text_column (str): Name of the text column
+
+    Returns:
+        dict: {"splits": {split: stats}, "total": stats, "size_category": str}
+    """
+    splits = {}
+    total = _new_split_stats()
+    for split, batches in batches_by_split.items():
+        stats = splits.setdefault(split, _new_split_stats())
+        for batch in batches:
+            _update_split_stats(stats, batch, text_column)
+
+    for stats in splits.values():
+        for key in ("num_rows", "text_chars", "multiple_punctuation", "arabic_punctuation", "gulf_markers", "msa_markers"):
+            total[key] += stats[key]
+        total["text_length_histogram"] += stats["text_length_histogram"]
+        total["text_length_max"] = max(total["text_length_max"], stats["text_length_max"])
+        if stats["text_length_min"] is not None:
+            total["text_length_min"] = stats["text_length_min"] if total["text_length_min"] is None else min(total["text_length_min"], stats["text_length_min"])
+        total["speakers"].update(stats["speakers"])
+        total["source_files"].update(stats["source_files"])
+
+    return {"splits": splits, "total": total, "size_category": size_category(total["num_rows"])}
+
+def stats_from_staging(staging_dir, text_column="text", batch_size=BATCH_SIZE, config_name="default"):
+    """Compute statistics by streaming the Parquet shards of one config written by export_parquet_shards"""
+    shards_by_split = {}
+    for path_in_repo, entry in sorted(load_manifest(staging_dir)["shards"].items()):
+        if entry.get("config", "default") != config_name:
+            continue
+        shards_by_split.setdefault(entry["split"], []).append(os.path.join(staging_dir, path_in_repo))
+
+    def iter_batches(paths):
+        for path in paths:
+            yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+
+    return compute_stats({split: iter_batches(paths) for split, paths in shards_by_split.items()}, text_column)
+
+def speaker_counts_from_staging(staging_dir, config_name, column="speakers", batch_size=BATCH_SIZE):
+    """
+    Count speakers from the list column of another staged config
+
+    The default config has no speaker column, but the topics config keeps the
+    speaker of every line of a segment (see rewayat_topic_join).
+    """
+    counter = Counter()
+    for path_in_repo, entry in sorted(load_manifest(staging_dir)["shards"].items()):
+        if entry.get("config", "default") != config_name:
+            continue
+        for batch in pq.ParquetFile(os.path.join(staging_dir, path_in_repo)).iter_batches(batch_size=batch_size, columns=[column]):
+            values, counts = pc.value_counts(pc.list_flatten(batch.column(column))).flatten()
+            counter.update(dict(zip(values.to_pylist(), counts.to_pylist())))
+    return counter
+
+def _percent(count, total):
+    return f"{100 * count / total:.1f}%" if total else "n/a"
+
+def format_stats_markdown(stats):
+    """
+    Render the statistics as Markdown sections for the dataset card
+
+    stats["speakers_source"], if set, says where speaker counts taken from
+    another config come from.
+    """
+    total = stats["total"]
+    num_rows = total["num_rows"]
+    lines = ["## Dataset Statistics", ""]
+
+    lines += ["| Split | Samples | Mean length (chars) |", "|---|---:|---:|"]
+    for split, split_stats in stats["splits"].items():
+        mean = split_stats["text_chars"] / split_stats["num_rows"] if split_stats["num_rows"] else 0
+        lines.append(f"| {split} | {split_stats['num_rows']:,} | {mean:.1f} |")
+    lines.append("")
+
+    lines += ["### Text length", "", "| Characters | Samples |", "|---|---:|"]
+    edges = TEXT_LENGTH_BINS + [None]
+    for low, high, count in zip(edges[:-1], edges[1:], total["text_length_histogram"].tolist()):
+        label = f"{low}-{high - 1}" if high is not None else f"{low}+"
+        lines.append(f"| {label} | {count:,} |")
+    lines += ["", f"Shortest: {total['text_length_min'] or 0} characters, longest: {total['text_length_max']} characters.", ""]
+
+    lines += ["### Punctuation and dialect indicators", ""]
+    lines.append(f"- **Two or more punctuation groups**: {_percent(total['multiple_punctuation'], num_rows)}")
+    lines.append(f"- **Arabic punctuation (، ؛ ؟)**: {_percent(total['arabic_punctuation'], num_rows)}")
+    lines.append(f"- **Gulf dialect markers** ({', '.join(GULF_MARKERS)}): {_percent(total['gulf_markers'], num_rows)}")
+    lines.append(f"- **MSA markers** ({', '.join(MSA_MARKERS)}): {_percent(total['msa_markers'], num_rows)}")
+    lines.append("")
+
+    lines += ["### Speakers", ""]
+    if total["speakers"]:
+        source = f" in {stats['speakers_source']}" if stats.get("speakers_source") else ""
+        lines += [f"{len(total['speakers']):,} distinct speakers{source}. Most frequent:", ""]
+        lines += [f"- {speaker}: {count:,}" for speaker, count in total["speakers"].most_common(TOP_K)]
+    else:
+        lines.append("Speaker names are not included in this dataset, so speaker counts are not available.")
+    lines.append("")
+
+    if total["source_files"]:
+        per_file = sorted(total["source_files"].values())
+        lines += [
+            "### Source files",
+            "",
+            f"{len(per_file):,} source files; samples per file: min {per_file[0]:,}, "
+            f"median {per_file[len(per_file) // 2]:,}, max {per_file[-1]:,}. Largest contributors:",
+            "",
+        ]
+        lines += [f"- {source}: {count:,}" for source, count in total["source_files"].most_common(TOP_K)]
+        lines.append("")
+
+    return "\n".join(lines)
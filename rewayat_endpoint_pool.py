@@ -0,0 +1,241 @@
+import time
+import statistics
+import threading
+from typing import Any, Dict, List, Optional
+import httpx
+import openai
+from langchain_openai import ChatOpenAI
+
+REQUEST_TIMEOUT = 600.0  # seconds; a request that takes longer counts as a failure of its endpoint
+HEALTH_CHECK_TIMEOUT = 5.0
+HEALTH_CHECK_INTERVAL = 15.0
+MAX_CONSECUTIVE_FAILURES = 2
+EJECT_SECONDS = 60.0
+SLOW_FACTOR = 3.0  # eject an endpoint whose average latency is this many times the pool median
+SLOW_REQUESTS = 3  # ... for this many requests in a row, so one long generation is not enough
+LATENCY_SMOOTHING = 0.3  # weight of the newest request in the moving average latency
+MAX_CONNECTIONS_PER_ENDPOINT = 8
+
+def is_endpoint_failure(error: Exception) -> bool:
+    """
+    Whether an error says something about the endpoint rather than the request
+
+    Connection errors, timeouts and 5xx responses count against the endpoint and are
+    retried elsewhere. 4xx responses (e.g. a prompt over the context length) would
+    fail on every replica, so they are raised to the caller as they are.
+    """
+    if is_pool_timeout(error):
+        return False
+    if isinstance(error, (openai.APIConnectionError, httpx.TransportError)):  # includes timeouts
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+def is_pool_timeout(error: Exception) -> bool:
+    """
+    Whether a request timed out waiting for one of its endpoint's pooled connections
+
+    openai wraps httpx.PoolTimeout in APITimeoutError. The endpoint is busy, not
+    broken (e.g. it took over the threads of an ejected replica), so the request is
+    retried elsewhere without counting a failure.
+    """
+    while error is not None:
+        if isinstance(error, httpx.PoolTimeout):
+            return True
+        error = error.__cause__
+    return False
+
+class Endpoint:
+    """One vLLM/OpenAI-compatible server with its own pooled HTTP client and health state"""
+
+    def __init__(self, base_url: str, model: str, api_key: str, request_timeout: float = REQUEST_TIMEOUT,
+                 max_connections: int = MAX_CONNECTIONS_PER_ENDPOINT, **llm_kwargs):
+        self.base_url = base_url.rstrip("/")
+        # Keep-alive connections are reused across requests to this endpoint only
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=request_timeout,
+        )
+        # Health probes get their own connection: the request client is kept saturated by
+        # least-outstanding routing, so a probe through it would wait for a busy replica
+        self.health_client = httpx.Client(
+            limits=httpx.Limits(max_connections=1, max_keepalive_connections=1),
+            timeout=HEALTH_CHECK_TIMEOUT,
+        )
+        self.llm = ChatOpenAI(
+            model=model,
+            openai_api_key=api_key,
+            openai_api_base=self.base_url,
+            http_client=self.http_client,
+            timeout=request_timeout,
+            max_retries=0,  # retries go to another endpoint via EndpointPool.invoke
+            **llm_kwargs,
+        )
+        self.outstanding = 0
+        self.failures = 0
+        self.latency: Optional[float] = None  # seconds per output token, moving average
+        self.slow_requests = 0
+        self.ejected_until = 0.0
+        self.ejected_by_health_check = False
+        self.completed = 0
+
+    def is_available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def __repr__(self):
+        return f"Endpoint({self.base_url}, outstanding={self.outstanding}, latency={self.latency}, failures={self.failures})"
+
+class EndpointPool:
+    """
+    Route chat requests over several endpoints, least-outstanding-first
+
+    Endpoints that fail MAX_CONSECUTIVE_FAILURES times in a row (see
+    is_endpoint_failure), fail a health check, or stay SLOW_FACTOR times slower per
+    output token than the pool median for SLOW_REQUESTS requests are ejected for
+    EJECT_SECONDS. A background thread polls `<base_url>/models` (see check_health).
+    If every endpoint is ejected, the one due back first is used rather than
+    stalling the run.
+    """
+
+    def __init__(self, base_urls: List[str], model: str, api_key: str,
+                 health_check_interval: Optional[float] = HEALTH_CHECK_INTERVAL, **endpoint_kwargs):
+        if not base_urls:
+            raise ValueError("EndpointPool needs at least one base URL")
+        self.endpoints = [Endpoint(base_url, model, api_key, **endpoint_kwargs) for base_url in base_urls]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread = None
+        if health_check_interval:
+            self._health_thread = threading.Thread(
+                target=self._health_loop, args=(health_check_interval,), daemon=True
+            )
+            self._health_thread.start()
+
+    def acquire(self, exclude=()) -> Endpoint:
+        """Reserve the available endpoint with the fewest in-flight requests (ties: lowest latency)"""
+        with self._lock:
+            now = time.monotonic()
+            remaining = [endpoint for endpoint in self.endpoints if endpoint not in exclude] or self.endpoints
+            candidates = [endpoint for endpoint in remaining if endpoint.is_available(now)]
+            if not candidates:
+                candidates = [min(remaining, key=lambda endpoint: endpoint.ejected_until)]
+            endpoint = min(candidates, key=lambda endpoint: (endpoint.outstanding, endpoint.latency or 0.0))
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, elapsed: Optional[float] = None, error: Optional[Exception] = None,
+                output_tokens: Optional[int] = None) -> None:
+        """
+        Return an endpoint after a request and update its health from the outcome
+
+        Only errors for which is_endpoint_failure holds count as failures; latency is
+        compared per output token so that long generations are not mistaken for a
+        slow replica.
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            if error is not None:
+                if not is_endpoint_failure(error):
+                    return
+                endpoint.failures += 1
+                if endpoint.failures >= MAX_CONSECUTIVE_FAILURES:
+                    self._eject(endpoint, f"{endpoint.failures} consecutive failures ({error})")
+                return
+
+            endpoint.failures = 0
+            endpoint.completed += 1
+            latency = elapsed / max(output_tokens or 1, 1)
+            if endpoint.latency is None:
+                endpoint.latency = latency
+            else:
+                endpoint.latency = LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * endpoint.latency
+
+            others = [other.latency for other in self.endpoints if other is not endpoint and other.latency is not None]
+            if not others or endpoint.latency <= SLOW_FACTOR * statistics.median(others):
+                endpoint.slow_requests = 0
+                return
+            endpoint.slow_requests += 1
+            if endpoint.slow_requests >= SLOW_REQUESTS:
+                self._eject(
+                    endpoint,
+                    f"average latency {endpoint.latency * 1000:.1f}ms/token vs pool median "
+                    f"{statistics.median(others) * 1000:.1f}ms/token for {endpoint.slow_requests} requests",
+                )
+
+    def _eject(self, endpoint: Endpoint, reason: str, by_health_check: bool = False) -> None:
+        # Caller holds self._lock
+        if endpoint.is_available(time.monotonic()):
+            print(f"Ejecting {endpoint.base_url} for {EJECT_SECONDS:.0f}s: {reason}")
+        endpoint.ejected_until = time.monotonic() + EJECT_SECONDS
+        endpoint.ejected_by_health_check = by_health_check
+        # It comes back with a clean slate rather than being judged on pre-ejection latency
+        endpoint.failures = 0
+        endpoint.latency = None
+        endpoint.slow_requests = 0
+
+    def check_health(self) -> Dict[str, Optional[bool]]:
+        """
+        Probe every endpoint's /models route
+
+        Failing endpoints are ejected. An endpoint ejected by a health check is
+        reinstated as soon as it answers again; one ejected for failed or slow
+        requests stays out until its ejection time has passed. A probe that could
+        not get a connection is inconclusive (None) and leaves the endpoint as it is.
+        """
+        results = {}
+        for endpoint in self.endpoints:
+            try:
+                response = endpoint.health_client.get(f"{endpoint.base_url}/models")
+                healthy = response.status_code == 200
+            except httpx.PoolTimeout:
+                results[endpoint.base_url] = None
+                continue
+            except Exception:
+                healthy = False
+            results[endpoint.base_url] = healthy
+            with self._lock:
+                if not healthy:
+                    self._eject(endpoint, "health check failed", by_health_check=True)
+                elif endpoint.ejected_by_health_check and not endpoint.is_available(time.monotonic()):
+                    print(f"Reinstating {endpoint.base_url}")
+                    endpoint.ejected_until = 0.0
+        return results
+
+    def _health_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.check_health()
+
+    def invoke(self, messages) -> Any:
+        """
+        Send a chat request, failing over to another endpoint until every endpoint has been tried
+
+        Errors that are not endpoint failures (4xx) are raised at once without failover;
+        a request that timed out waiting for a connection fails over without a failure.
+        """
+        last_error = None
+        tried = []
+        for _ in range(len(self.endpoints)):
+            endpoint = self.acquire(exclude=tried)
+            tried.append(endpoint)
+            start = time.monotonic()
+            try:
+                response = endpoint.llm.invoke(messages)
+            except Exception as e:
+                self.release(endpoint, error=e)
+                if not is_endpoint_failure(e) and not is_pool_timeout(e):
+                    raise
+                print(f"Request to {endpoint.base_url} failed: {e}")
+                last_error = e
+                continue
+            usage = getattr(response, "usage_metadata", None) or {}
+            self.release(endpoint, elapsed=time.monotonic() - start, output_tokens=usage.get("output_tokens"))
+            return response
+        raise last_error
+
+    def close(self) -> None:
+        """Stop health checks and close the pooled HTTP connections"""
+        self._stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+        for endpoint in self.endpoints:
+            endpoint.http_client.close()
+            endpoint.health_client.close()
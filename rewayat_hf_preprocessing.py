@@ -3,11 +3,7 @@ import glob
 import html
 import re
 import warnings
-import pandas as pd
-from lingua import Language, LanguageDetectorBuilder
-
-languages = [Language.ARABIC]
-detector = LanguageDetectorBuilder.from_languages(*languages).build()
+from rewayat_language import is_arabic
 
 
 REWAYAT_SEARCH_DIR = "rewayat/rewayat-files-pos-segmented-html-cleaned/*"
@@ -62,13 +58,15 @@ def has_multiple_punctuation_marks(text):
 
 def extract_speaker_paragraphs_with_punctuation(text):
     """Extract only paragraphs that contain speaker dialogue with multiple punctuation marks"""
+    from rewayat_buffers import TextBuffer  # imports pyarrow, so only once there is text to buffer
+
     # First clean HTML entities and process backslashes
     text = clean_html_entities(text)
     text = process_backslashes(text)
     
     # Split into sections
     sections = text.split('##########')
-    speaker_paragraphs = []
+    speaker_paragraphs = TextBuffer()
     
     for section in sections:
         if not section.strip():
@@ -102,8 +100,7 @@ def extract_speaker_paragraphs_with_punctuation(text):
                 if not has_multiple_punctuation_marks(paragraph):
                     continue
                 # Check if dialogue is in Arabic
-                lang_detected = detector.detect_language_of(dialogue)
-                if lang_detected != Language.ARABIC:
+                if not is_arabic(dialogue):
                     continue
 
                 if not has_multiple_punctuation_marks(dialogue):
@@ -125,4 +122,6 @@ if __name__ == "__main__":
             text = f.read()
 
         speaker_paragraphs = extract_speaker_paragraphs_with_punctuation(text)
-        pd.DataFrame(speaker_paragraphs, columns=["text"]).to_csv(target_file, index=False, sep='\t', quoting=1)
+        # Same output as pd.DataFrame(..., columns=["text"]).to_csv(sep='\t', quoting=1) without building a DataFrame
+        with open(target_file, 'w', encoding='utf-8') as f:
+            speaker_paragraphs.write_tsv(f)
@@ -0,0 +1,320 @@
+import os
+import glob
+import json
+import shutil
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+STAGING_DIR = "hf_staging"
+DATA_DIR = "data"  # shards of the default config live under data/ in both the staging dir and the Hub repo
+DEFAULT_CONFIG = "default"
+MANIFEST_NAME = "manifest.json"
+TARGET_SHARD_BYTES = 128 * 1024 * 1024
+SHARD_KEY = "source_file"
+NUM_WORKERS = os.cpu_count() or 1
+COMMIT_EVERY = 8  # shards per Hub commit, so an interrupted upload only loses the last batch
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Return the hex sha256 of a file (the same hash the Hub reports for LFS files)"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _key_hash(key):
+    """Stable 64-bit hash of a shard key"""
+    return int.from_bytes(hashlib.blake2s(str(key).encode(), digest_size=8).digest(), "big")
+
+def dataset_to_table(dataset):
+    """
+    Convert a Hugging Face Dataset into a pyarrow Table without going through pandas
+
+    The pandas index column added by Dataset.from_pandas is dropped: it holds row
+    positions in the combined dataframe, which shift whenever a TSV is added.
+    """
+    table = dataset.with_format("arrow")[:]
+    index_columns = [name for name in table.column_names if name.startswith("__index_level_")]
+    return table.drop_columns(index_columns)
+
+def plan_shards(table, target_shard_bytes=TARGET_SHARD_BYTES, key=SHARD_KEY):
+    """
+    Sort a table and cut it into size-targeted contiguous shards
+
+    Rows are sorted by `key` (then by the remaining columns) and shard boundaries are
+    placed after keys whose hash is divisible by a power of two, so they depend on the
+    keys themselves rather than on row positions. Adding a few source files to the
+    corpus then only changes the shards those files land in; every other shard is
+    byte-identical to the previous export and is skipped on upload.
+
+    Args:
+        table (pa.Table): Rows of one split
+        target_shard_bytes (int): Approximate in-memory size of a shard
+        key (str): Column that groups rows (rows sharing a key never span shards)
+
+    Returns:
+        list[pa.Table]: Zero-copy slices of the sorted table (none for an empty table)
+    """
+    # A zero-row Parquet file breaks load_dataset, so empty splits get no shards at all
+    if table.num_rows == 0:
+        return []
+
+    if key not in table.column_names:
+        # No grouping column: fall back to fixed-size row chunks
+        rows_per_shard = max(1, int(table.num_rows * target_shard_bytes / max(table.nbytes, 1)))
+        return [table.slice(offset, rows_per_shard) for offset in range(0, table.num_rows, rows_per_shard)]
+
+    # Nested columns (e.g. the list columns of the topics config) cannot be sorted on
+    sort_keys = [(key, "ascending")] + [
+        (field.name, "ascending") for field in table.schema
+        if field.name != key and not pa.types.is_nested(field.type)
+    ]
+    table = table.sort_by(sort_keys)
+
+    # value_counts keeps first-seen order, which is already sorted
+    keys, key_rows = (column.to_pylist() for column in pc.value_counts(table[key]).flatten())
+    bytes_per_row = table.nbytes / table.num_rows
+    avg_key_bytes = table.nbytes / len(keys)
+
+    # Expected number of keys per shard, rounded to a power of two so that a slightly
+    # grown corpus keeps the same boundaries
+    keys_per_shard = max(1, target_shard_bytes / avg_key_bytes)
+    mask = (1 << max(0, round(keys_per_shard).bit_length() - 1)) - 1
+
+    shards = []
+    offset = 0
+    length = 0
+    for key_value, rows in zip(keys, key_rows):
+        length += rows
+        # Hard cap at twice the target so an unlucky run of keys cannot produce a huge shard
+        if (_key_hash(key_value) & mask) == 0 or length * bytes_per_row >= 2 * target_shard_bytes:
+            shards.append(table.slice(offset, length))
+            offset += length
+            length = 0
+    if length:
+        shards.append(table.slice(offset, length))
+    return shards
+
+def _shard_name(split, shard, shard_idx, key=SHARD_KEY):
+    """Name a shard after its first key so that unchanged shards keep their path"""
+    if key in shard.column_names and shard.num_rows:
+        tag = hashlib.blake2s(str(shard[key][0].as_py()).encode(), digest_size=4).hexdigest()
+    else:
+        tag = f"{shard_idx:05d}"
+    return f"{split}-{tag}.parquet"
+
+def config_data_dir(config_name):
+    """Directory holding a config's shards: data/ for the default config, <config_name>/ otherwise"""
+    return DATA_DIR if config_name == DEFAULT_CONFIG else config_name
+
+def _write_shard(shard, local_path):
+    """Write one shard to Parquet and return its manifest entry"""
+    pq.write_table(shard, local_path)
+    return {
+        "num_rows": shard.num_rows,
+        "num_bytes": os.path.getsize(local_path),
+        "sha256": file_sha256(local_path),
+    }
+
+def export_parquet_shards(dataset, staging_dir=STAGING_DIR, target_shard_bytes=TARGET_SHARD_BYTES,
+                          key=SHARD_KEY, num_workers=NUM_WORKERS, config_name=DEFAULT_CONFIG):
+    """
+    Export a Dataset or DatasetDict to size-targeted Parquet shards in a staging directory
+
+    Shards are written in parallel (pyarrow releases the GIL while encoding) to
+    `<staging_dir>/data/<split>-<tag>.parquet`, and a manifest with the row count,
+    size and sha256 of every shard is written to `<staging_dir>/manifest.json`.
+    Other configs go to `<staging_dir>/<config_name>/` and share the manifest, so
+    exporting one config leaves the shards of the others in place. Splits without
+    rows get no shards, so they are absent from the manifest and the card.
+
+    Args:
+        dataset: Dataset or DatasetDict to export (a Dataset is exported as "train");
+            a dict of pyarrow Tables is accepted as well
+        staging_dir (str): Local directory to write shards to (previous shards are removed)
+        target_shard_bytes (int): Approximate in-memory size of a shard
+        key (str): Column that groups rows into shards (see plan_shards)
+        num_workers (int): Number of shards written concurrently
+        config_name (str): Hub dataset config the shards belong to
+
+    Returns:
+        dict: The manifest ({"shards": {path_in_repo: entry}})
+    """
+    splits = dataset if hasattr(dataset, "keys") else {"train": dataset}
+
+    config_dir = config_data_dir(config_name)
+    data_dir = os.path.join(staging_dir, config_dir)
+    shutil.rmtree(data_dir, ignore_errors=True)
+    os.makedirs(data_dir, exist_ok=True)
+
+    jobs = []
+    for split, split_dataset in splits.items():
+        table = split_dataset if isinstance(split_dataset, pa.Table) else dataset_to_table(split_dataset)
+        for shard_idx, shard in enumerate(plan_shards(table, target_shard_bytes, key)):
+            path_in_repo = f"{config_dir}/{_shard_name(split, shard, shard_idx, key)}"
+            jobs.append((split, path_in_repo, shard))
+
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        futures = [
+            executor.submit(_write_shard, shard, os.path.join(staging_dir, path_in_repo))
+            for _, path_in_repo, shard in jobs
+        ]
+        entries = [future.result() for future in futures]
+
+    # Keep the shards of other configs exported into the same staging dir
+    manifest = {"shards": {}}
+    if os.path.exists(os.path.join(staging_dir, MANIFEST_NAME)):
+        manifest = load_manifest(staging_dir)
+        manifest["shards"] = {
+            path_in_repo: entry for path_in_repo, entry in manifest["shards"].items()
+            if entry.get("config", DEFAULT_CONFIG) != config_name
+            and os.path.exists(os.path.join(staging_dir, path_in_repo))
+        }
+    for (split, path_in_repo, _), entry in zip(jobs, entries):
+        entry["split"] = split
+        entry["config"] = config_name
+        manifest["shards"][path_in_repo] = entry
+
+    with open(os.path.join(staging_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    total_bytes = sum(entry["num_bytes"] for entry in entries)
+    print(f"Exported {len(jobs)} shards ({total_bytes / 1024 / 1024:.1f} MiB) to {data_dir}")
+    return manifest
+
+def prune_configs(staging_dir, config_names):
+    """
+    Drop every config not in `config_names` from the staging dir and its manifest
+
+    export_parquet_shards keeps other configs' shards, so a config that is not
+    published on this run (e.g. topics without annotations) would otherwise still
+    be uploaded and listed on the card. Its shards are then deleted from the
+    target by upload_shards as stale.
+    """
+    if not os.path.exists(os.path.join(staging_dir, MANIFEST_NAME)):
+        return
+    manifest = load_manifest(staging_dir)
+    dropped = {entry.get("config", DEFAULT_CONFIG) for entry in manifest["shards"].values()} - set(config_names)
+    if not dropped:
+        return
+    manifest["shards"] = {
+        path_in_repo: entry for path_in_repo, entry in manifest["shards"].items()
+        if entry.get("config", DEFAULT_CONFIG) not in dropped
+    }
+    for config_name in dropped:
+        shutil.rmtree(os.path.join(staging_dir, config_data_dir(config_name)), ignore_errors=True)
+    with open(os.path.join(staging_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    print(f"Removed configs no longer published from {staging_dir}: {sorted(dropped)}")
+
+def load_manifest(staging_dir=STAGING_DIR):
+    """Load the manifest written by export_parquet_shards"""
+    with open(os.path.join(staging_dir, MANIFEST_NAME)) as f:
+        return json.load(f)
+
+class LocalDirTarget:
+    """Upload target that mirrors shards into a local directory (for tests and dry runs)"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def remote_hashes(self):
+        """Return {path_in_repo: sha256} for the shards already present"""
+        paths = glob.glob(os.path.join(self.root, "**", "*.parquet"), recursive=True)
+        return {os.path.relpath(path, self.root).replace(os.sep, "/"): file_sha256(path) for path in paths}
+
+    def commit(self, additions, deletions, message):
+        """Copy (local_path, path_in_repo) pairs in and remove deleted paths"""
+        for local_path, path_in_repo in additions:
+            target_path = os.path.join(self.root, path_in_repo)
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            shutil.copyfile(local_path, target_path)
+        for path_in_repo in deletions:
+            os.remove(os.path.join(self.root, path_in_repo))
+
+class HubTarget:
+    """Upload target backed by a Hugging Face dataset repository"""
+
+    def __init__(self, repo_id, private=False, token=None):
+        from huggingface_hub import HfApi
+
+        self.repo_id = repo_id
+        self.api = HfApi(token=token)
+        self.api.create_repo(repo_id=repo_id, repo_type="dataset", private=private, exist_ok=True)
+
+    def remote_hashes(self):
+        """Return {path_in_repo: sha256} for the Parquet shards already on the Hub"""
+        from huggingface_hub.hf_api import RepoFile
+        from huggingface_hub.utils import EntryNotFoundError, RepositoryNotFoundError
+
+        try:
+            entries = self.api.list_repo_tree(self.repo_id, recursive=True, repo_type="dataset")
+            # Parquet shards are stored in LFS, whose oid is the sha256 of the file
+            return {
+                entry.path: entry.lfs.sha256
+                for entry in entries
+                if isinstance(entry, RepoFile) and entry.path.endswith(".parquet") and entry.lfs
+            }
+        except (RepositoryNotFoundError, EntryNotFoundError) as e:
+            # A fresh repo may not have any files yet. Other errors (auth, network, rate
+            # limits) propagate: treating them as "no shards" would re-upload everything
+            # and skip the stale-shard deletion
+            print(f"No existing shards found in {self.repo_id}: {e}")
+            return {}
+
+    def commit(self, additions, deletions, message):
+        """Add and delete files in a single Hub commit"""
+        from huggingface_hub import CommitOperationAdd, CommitOperationDelete
+
+        operations = [
+            CommitOperationAdd(path_in_repo=path_in_repo, path_or_fileobj=local_path)
+            for local_path, path_in_repo in additions
+        ] + [CommitOperationDelete(path_in_repo=path_in_repo) for path_in_repo in deletions]
+        self.api.create_commit(
+            repo_id=self.repo_id, operations=operations, commit_message=message, repo_type="dataset"
+        )
+
+def upload_shards(staging_dir, target, commit_every=COMMIT_EVERY):
+    """
+    Upload the shards of a staging directory, skipping those the target already has
+
+    The target is asked for the sha256 of its current shards, so the upload is
+    resumable: rerunning after a failure (or after re-exporting a slightly grown
+    corpus) only sends shards whose hash differs. Shards that are no longer in the
+    manifest are deleted in the last commit, once every new shard is in place.
+
+    Args:
+        staging_dir (str): Directory written by export_parquet_shards
+        target: LocalDirTarget or HubTarget
+        commit_every (int): Number of shards per commit
+
+    Returns:
+        dict: Counts of uploaded, skipped and deleted shards
+    """
+    manifest = load_manifest(staging_dir)
+    remote = target.remote_hashes()
+
+    pending = [
+        (os.path.join(staging_dir, path_in_repo), path_in_repo)
+        for path_in_repo, entry in sorted(manifest["shards"].items())
+        if remote.get(path_in_repo) != entry["sha256"]
+    ]
+    stale = sorted(path for path in remote if path not in manifest["shards"])
+    print(f"{len(pending)} shards to upload, {len(manifest['shards']) - len(pending)} unchanged, {len(stale)} to delete")
+
+    batches = [pending[i:i + commit_every] for i in range(0, len(pending), commit_every)] or [[]]
+    for batch_idx, batch in enumerate(batches):
+        deletions = stale if batch_idx == len(batches) - 1 else []
+        if not batch and not deletions:
+            continue
+        target.commit(batch, deletions, f"Upload shards (batch {batch_idx + 1}/{len(batches)})")
+
+    return {
+        "uploaded": len(pending),
+        "skipped": len(manifest["shards"]) - len(pending),
+        "deleted": len(stale),
+    }
@@ -0,0 +1,315 @@
+import os
+import re
+import sys
+import glob
+import json
+import random
+import argparse
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from rewayat_normalization import normalize_text
+
+DIALOGUE_DIR = "data_rewayat_jsonl"  # written by build_jsonl_data
+INDEX_PARTS_DIR = "rewayat_index_parts"  # one postings part per novel, written during extraction
+INDEX_DIR = "rewayat_index"
+
+KIND_TOKEN = 0
+KIND_SPEAKER = 1
+KIND_NAMES = {KIND_TOKEN: "tokens", KIND_SPEAKER: "speakers"}
+
+# Arabic letters (incl. Persian/Urdu additions used in Gulf spelling); digits and punctuation split tokens
+ARABIC_TOKEN = re.compile(r"[ء-غف-يٮ-ۓەۺ-ۿ]+")
+
+def token_sequence(text):
+    """Return the normalized Arabic tokens of a line, in order and with repeats"""
+    return ARABIC_TOKEN.findall(normalize_text(text))
+
+def tokenize(text):
+    """Return the distinct normalized Arabic tokens of a line, in order of first appearance"""
+    return list(dict.fromkeys(token_sequence(text)))
+
+def token_positions(text):
+    """Return {token: [positions]} for the normalized tokens of a line, in order of first appearance"""
+    positions = {}
+    for position, token in enumerate(token_sequence(text)):
+        positions.setdefault(token, []).append(position)
+    return positions
+
+def speaker_key(speaker):
+    """Speakers are looked up by their normalized name, so أماني and اماني match"""
+    return normalize_text(speaker)
+
+def _part_schema():
+    return pa.schema([
+        ("key", pa.string()), ("kind", pa.int8()), ("file_id", pa.string()), ("line_id", pa.int32()),
+        ("positions", pa.list_(pa.int32())),
+    ])
+
+def section_postings(sections):
+    """
+    Build the postings of some SectionBuffers as a pyarrow Table (key, kind, file_id, line_id, positions)
+
+    Each line contributes one speaker posting and one posting per distinct token,
+    which lists the token's positions in the line (for phrase queries).
+    """
+    keys, kinds, file_ids, line_ids, positions = [], [], [], [], []
+    for section in sections:
+        for line_id, text in enumerate(section.iter_texts()):
+            tokens = token_positions(text)
+            keys.append(speaker_key(section.speaker(line_id)))
+            keys.extend(tokens)
+            kinds.append(KIND_SPEAKER)
+            kinds.extend([KIND_TOKEN] * len(tokens))
+            file_ids.extend([section.file_id] * (len(tokens) + 1))
+            line_ids.extend([line_id] * (len(tokens) + 1))
+            positions.append([])
+            positions.extend(tokens.values())
+    return pa.table([keys, kinds, file_ids, line_ids, positions], schema=_part_schema())
+
+def write_index_part(sections, part_name, parts_dir=INDEX_PARTS_DIR):
+    """Write the postings of one novel's written sections to <parts_dir>/<part_name>.arrow"""
+    os.makedirs(parts_dir, exist_ok=True)
+    table = section_postings(sections)
+    with pa.OSFile(os.path.join(parts_dir, f"{part_name}.arrow"), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+def _write_ipc(table, path):
+    # Uncompressed so that queries can memory-map the columns without decoding
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+def build_index(parts_dir=INDEX_PARTS_DIR, index_dir=INDEX_DIR):
+    """
+    Merge the per-novel postings parts into the on-disk index
+
+    Layout of `index_dir` (Arrow IPC files, memory-mapped by queries):
+
+    - files.arrow: sorted file_id strings
+    - tokens.arrow / speakers.arrow: sorted lexicon (key, start, count)
+    - tokens_postings.arrow / speakers_postings.arrow: (file_idx, line_id) rows;
+      the postings of lexicon entry i are rows [start, start + count). Token
+      postings also hold the token's positions in the line
+    """
+    paths = sorted(glob.glob(os.path.join(parts_dir, "*.arrow")))
+    if not paths:
+        # e.g. an extraction run in which no section had enough dialogue lines
+        print(f"No index parts found in {parts_dir}; index not built")
+        return
+    postings = pa.concat_tables([pa.ipc.open_file(pa.memory_map(path)).read_all() for path in paths])
+
+    files = pc.unique(postings["file_id"]).sort()
+    postings = postings.append_column("file_idx", pc.cast(pc.index_in(postings["file_id"], value_set=files), pa.int32()))
+
+    os.makedirs(index_dir, exist_ok=True)
+    _write_ipc(pa.table({"file_id": files}), os.path.join(index_dir, "files.arrow"))
+
+    for kind, name in KIND_NAMES.items():
+        # One record batch per file, so that queries slice a single chunk
+        kind_postings = postings.filter(pc.equal(postings["kind"], kind)).sort_by(
+            [("key", "ascending"), ("file_idx", "ascending"), ("line_id", "ascending")]
+        ).combine_chunks()
+        # value_counts keeps first-seen order, which is sorted here
+        keys, counts = pc.value_counts(kind_postings["key"]).flatten()
+        starts = pc.subtract(pc.cumulative_sum(counts), counts)
+        _write_ipc(pa.table({"key": keys, "start": starts, "count": counts}), os.path.join(index_dir, f"{name}.arrow"))
+        columns = ["file_idx", "line_id", "positions"] if kind == KIND_TOKEN else ["file_idx", "line_id"]
+        _write_ipc(kind_postings.select(columns), os.path.join(index_dir, f"{name}_postings.arrow"))
+        print(f"Indexed {len(keys):,} {name} with {kind_postings.num_rows:,} postings")
+
+    print(f"Index of {len(files):,} sections written to {index_dir}")
+
+class RewayatIndex:
+    """Read-only view of an index written by build_index; every file is memory-mapped"""
+
+    def __init__(self, index_dir=INDEX_DIR, dialogue_dir=DIALOGUE_DIR):
+        def load(name):
+            return pa.ipc.open_file(pa.memory_map(os.path.join(index_dir, f"{name}.arrow"))).read_all()
+
+        self.dialogue_dir = dialogue_dir
+        self.files = load("files")["file_id"]
+        self.lexicons = {name: load(name) for name in KIND_NAMES.values()}
+        self.postings = {name: load(f"{name}_postings") for name in KIND_NAMES.values()}
+
+    def _find(self, name, key):
+        """Binary search the sorted lexicon; return (start, count) or None"""
+        keys = self.lexicons[name]["key"]
+        low, high = 0, len(keys)
+        while low < high:
+            mid = (low + high) // 2
+            if keys[mid].as_py() < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < len(keys) and keys[low].as_py() == key:
+            lexicon = self.lexicons[name]
+            return lexicon["start"][low].as_py(), lexicon["count"][low].as_py()
+        return None
+
+    def _count(self, name, key):
+        """Number of postings of a key, read from the lexicon"""
+        found = self._find(name, key)
+        return found[1] if found else 0
+
+    def _lines(self, name, key):
+        """
+        Return the postings of a key as a sorted int64 numpy array of packed lines
+
+        A line is packed as (file_idx << 32) | line_id (see unpack_lines), so lines can
+        be intersected and sampled as one array without building Python objects. The
+        columns are read through numpy views of the memory-mapped postings.
+        """
+        found = self._find(name, key)
+        if found is None:
+            return np.array([], dtype=np.int64)
+        rows = self.postings[name].slice(*found)
+        file_idx = rows["file_idx"].to_numpy().astype(np.int64)
+        return (file_idx << 32) | rows["line_id"].to_numpy()
+
+    def speaker_lines(self, speaker):
+        return self._lines("speakers", speaker_key(speaker))
+
+    def token_lines(self, query):
+        """
+        Lines containing `query` as a phrase: its normalized tokens next to each other, in order
+
+        Lines holding every token are found first by intersecting the postings; the
+        token positions stored with the postings then keep only the lines where the
+        tokens follow each other.
+        """
+        sequence = token_sequence(query)
+        # Start from the rarest token, using the lexicon counts to order them
+        tokens = sorted(dict.fromkeys(sequence), key=lambda token: self._count("tokens", token))
+        if not tokens or self._count("tokens", tokens[0]) == 0:
+            return np.array([], dtype=np.int64)
+        lines = self._lines("tokens", tokens[0])
+        # Row of each remaining line within every token's postings, for the phrase check
+        rows = {tokens[0]: np.arange(len(lines))}
+        for token in tokens[1:]:
+            # Postings are sorted, so each remaining line is looked up by binary search
+            other = self._lines("tokens", token)
+            positions = np.minimum(np.searchsorted(other, lines), len(other) - 1)
+            found = other[positions] == lines
+            lines = lines[found]
+            rows = {key: key_rows[found] for key, key_rows in rows.items()}
+            rows[token] = positions[found]
+        if len(sequence) > 1 and len(lines):
+            lines = self._phrase_lines(sequence, lines, rows)
+        return lines
+
+    def _occurrences(self, token, rows):
+        """
+        Return the occurrences of a token in some of its postings rows as sorted packed
+        int64 (candidate << 32) | position, where candidate indexes `rows`
+        """
+        start, _ = self._find("tokens", token)
+        rows = start + rows
+        positions = self.postings["tokens"]["positions"].chunk(0)
+        offsets = positions.offsets.to_numpy()
+        values = positions.values.to_numpy()
+        # Gather the position lists of the candidate rows without a Python loop
+        lengths = offsets[rows + 1] - offsets[rows]
+        firsts = np.repeat(offsets[rows] - np.cumsum(lengths) + lengths, lengths)
+        candidate = np.repeat(np.arange(len(rows), dtype=np.int64), lengths)
+        return (candidate << 32) | values[firsts + np.arange(lengths.sum())]
+
+    def _phrase_lines(self, sequence, lines, rows):
+        """Keep the candidate lines in which the tokens of `sequence` appear consecutively"""
+        # Phrase starts: occurrences of the first token, then shifted matches for the others
+        starts = self._occurrences(sequence[0], rows[sequence[0]])
+        for offset, token in enumerate(sequence[1:], start=1):
+            following = self._occurrences(token, rows[token])
+            following = following[(following & 0xFFFFFFFF) >= offset] - offset
+            if not len(following):
+                return lines[:0]
+            found = np.minimum(np.searchsorted(following, starts), len(following) - 1)
+            starts = starts[following[found] == starts]
+        # starts are sorted by candidate: keep each candidate once
+        candidates = starts >> 32
+        return lines[candidates[np.diff(candidates, prepend=-1) != 0]]
+
+    def counts(self, command, query):
+        """
+        Return (lines, sections) for a speaker or phrase query
+
+        Single keys are answered from the lexicon and the file_idx column of their
+        postings; only multi-token phrases need an intersection.
+        """
+        if command == "speaker":
+            name, keys = "speakers", [speaker_key(query)]
+        else:
+            name, keys = "tokens", token_sequence(query)
+        if len(keys) == 1:
+            found = self._find(name, keys[0])
+            if found is None:
+                return 0, 0
+            return found[1], _count_runs(self.postings[name]["file_idx"].slice(*found).to_numpy())
+        lines = self.token_lines(query)
+        return len(lines), _count_runs(lines >> 32)
+
+    def file_id(self, file_idx):
+        return self.files[file_idx].as_py()
+
+    def context(self, file_idx, line_id, radius=1):
+        """Return the lines around (file_id, line_id) from the extracted JSONL"""
+        path = os.path.join(self.dialogue_dir, f"{self.file_id(file_idx)}.jsonl")
+        if not os.path.exists(path):
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        return [record for record in records if abs(record["line_id"] - line_id) <= radius]
+
+def _count_runs(values):
+    """Number of distinct values in a sorted numpy array"""
+    return int(np.count_nonzero(np.diff(values))) + 1 if len(values) else 0
+
+def unpack_lines(lines):
+    """Convert packed lines (see RewayatIndex._lines) into a list of (file_idx, line_id)"""
+    return [(packed >> 32, packed & 0xFFFFFFFF) for packed in lines.tolist()]
+
+def sample_lines(lines, sample, seed=0):
+    """Pick `sample` packed lines at random (all if sample is 0) and unpack only those"""
+    if sample and len(lines) > sample:
+        lines = lines[sorted(random.Random(seed).sample(range(len(lines)), sample))]
+    return unpack_lines(lines)
+
+def _print_lines(index, lines, sample, radius, seed):
+    for file_idx, line_id in sample_lines(lines, sample, seed):
+        print(f"\n{index.file_id(file_idx)}:{line_id}")
+        for record in index.context(file_idx, line_id, radius):
+            marker = ">" if record["line_id"] == line_id else " "
+            print(f"  {marker} [{record['line_id']}] {record['speaker']}: {record['text']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the speaker/token index of the extracted rewayat dialogues")
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    parser.add_argument("--dialogue-dir", default=DIALOGUE_DIR)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="merge the index parts written during extraction")
+    build.add_argument("--parts-dir", default=INDEX_PARTS_DIR)
+
+    for command, help_text in [("speaker", "lines spoken by a speaker"), ("token", "lines containing a word or phrase (normalized tokens, consecutive and in order)")]:
+        query = subparsers.add_parser(command, help=help_text)
+        query.add_argument("query")
+        query.add_argument("--sample", type=int, default=5, help="number of example lines to print (0 for all)")
+        query.add_argument("--context", type=int, default=1, help="lines of context around each example")
+        query.add_argument("--seed", type=int, default=0)
+        query.add_argument("--count", action="store_true", help="only print the counts")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        build_index(args.parts_dir, args.index_dir)
+        return
+
+    index = RewayatIndex(args.index_dir, args.dialogue_dir)
+    num_lines, num_sections = index.counts(args.command, args.query)
+    print(f"{args.command} {args.query!r}: {num_lines:,} lines in {num_sections:,} sections")
+    if not args.count:
+        lines = index.speaker_lines(args.query) if args.command == "speaker" else index.token_lines(args.query)
+        _print_lines(index, lines, args.sample, args.context, args.seed)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,16 @@
+# lingua is imported on first use so that importing the extraction scripts (tests, worker spawn) stays cheap
+_detector = None
+_arabic = None
+
+def get_detector():
+    """Return the lingua Arabic detector, building it on first call"""
+    global _detector, _arabic
+    if _detector is None:
+        from lingua import Language, LanguageDetectorBuilder
+        _arabic = Language.ARABIC
+        _detector = LanguageDetectorBuilder.from_languages(Language.ARABIC).build()
+    return _detector
+
+def is_arabic(text):
+    """Check if lingua detects the text as Arabic"""
+    return get_detector().detect_language_of(text) == _arabic
@@ -0,0 +1,99 @@
+import re
+import pyarrow as pa
+import pyarrow.compute as pc
+
+TATWEEL = "ـ"
+# Harakat, shadda, sukun, maddah/hamza marks, superscript alef and Quranic annotation marks
+DIACRITICS = "".join(chr(c) for c in range(0x064B, 0x0660)) + "ٰ" + "".join(chr(c) for c in range(0x06D6, 0x06EE))
+# Zero-width spaces/joiners, bidi controls, BOM and soft hyphen
+INVISIBLE = "".join(chr(c) for c in [*range(0x200B, 0x2010), *range(0x202A, 0x202F), *range(0x2066, 0x206A), 0xFEFF, 0x00AD])
+
+REMOVE_CHARS = TATWEEL + DIACRITICS + INVISIBLE
+CHAR_MAP = {
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",  # alef with hamza/madda/wasla -> bare alef
+    "ى": "ي", "ی": "ي",  # alef maqsura and Farsi yeh -> yeh
+    "ة": "ه",  # teh marbuta -> heh
+    "ک": "ك",  # keheh -> kaf
+}
+PUNCTUATION_MARKS = ".!?،؛؟,"
+# Spelled out because \s means Unicode whitespace to `re` but ASCII whitespace to RE2
+WHITESPACE_CHARS = " \t\n\r\f\v\xa0\u1680" + "".join(chr(c) for c in range(0x2000, 0x200B)) + "\u2028\u2029\u202f\u205f\u3000"
+
+# Precompiled once at import: a str.translate table and the regexes used by normalize_text
+TRANSLATION_TABLE = str.maketrans({**CHAR_MAP, **{c: None for c in REMOVE_CHARS}})
+REPEATED_PUNCTUATION = re.compile(r"([" + re.escape(PUNCTUATION_MARKS) + r"])\1+")
+WHITESPACE = re.compile("[" + re.escape(WHITESPACE_CHARS) + "]+")
+
+def _re2_class(chars):
+    """Build an RE2 character class from a string of characters"""
+    return "[" + "".join(f"\\x{{{ord(c):04X}}}" for c in chars) + "]"
+
+# RE2 (used by pyarrow.compute) has no backreferences or translate, so the same rules are
+# expressed as one removal pass, one pass per target letter and one pass per punctuation mark
+ARROW_REMOVE_PATTERN = _re2_class(REMOVE_CHARS)
+ARROW_MAP_PATTERNS = [
+    (_re2_class("".join(src for src, dst in CHAR_MAP.items() if dst == target)), target)
+    for target in sorted(set(CHAR_MAP.values()))
+]
+ARROW_PUNCTUATION_PATTERNS = [(_re2_class(mark) + "{2,}", mark) for mark in PUNCTUATION_MARKS]
+ARROW_REPEATED_PUNCTUATION = "|".join(pattern for pattern, _ in ARROW_PUNCTUATION_PATTERNS)
+ARROW_WHITESPACE_PATTERN = _re2_class(WHITESPACE_CHARS) + "+"
+# Rows that need whitespace cleanup: any non-space whitespace, a double space or an edge space
+ARROW_UNTIDY_WHITESPACE = _re2_class(WHITESPACE_CHARS.replace(" ", "")) + "|  |^ | $"
+
+def normalize_text(text):
+    """
+    Normalize a single Arabic string
+
+    Removes tatweel, diacritics and zero-width/bidi characters, unifies alef, yeh,
+    teh marbuta and kaf forms, collapses runs of the same punctuation mark and
+    squeezes whitespace. normalize_series and normalize_arrow apply the same rules
+    to whole columns.
+    """
+    text = text.translate(TRANSLATION_TABLE)
+    text = REPEATED_PUNCTUATION.sub(r"\1", text)
+    return WHITESPACE.sub(" ", text).strip(" ")
+
+def normalize_series(series):
+    """Normalize a pandas string Series (see normalize_text) with the pyarrow.compute kernels"""
+    import pandas as pd
+
+    # str.translate on non-ASCII text costs a dict lookup per character, so go through Arrow
+    normalized = normalize_arrow(pa.array(series, type=pa.string(), from_pandas=True))
+    return pd.Series(normalized.to_pandas(), index=series.index, name=series.name)
+
+def _apply_where(array, detect_pattern, fn):
+    """Apply `fn` only to the rows matching `detect_pattern` (most rows need no rewrite)"""
+    mask = pc.fill_null(pc.match_substring_regex(array, detect_pattern), False)
+    if not pc.any(mask).as_py():
+        return array
+    return pc.replace_with_mask(array, mask, fn(pc.filter(array, mask)))
+
+def _remove_chars(array):
+    return pc.replace_substring_regex(array, ARROW_REMOVE_PATTERN, "")
+
+def _collapse_punctuation(array):
+    for pattern, replacement in ARROW_PUNCTUATION_PATTERNS:
+        array = pc.replace_substring_regex(array, pattern, replacement)
+    return array
+
+def _squeeze_whitespace(array):
+    array = pc.replace_substring_regex(array, ARROW_WHITESPACE_PATTERN, " ")
+    return pc.utf8_trim(array, characters=" ")
+
+def normalize_arrow(array):
+    """Normalize a pyarrow string Array/ChunkedArray (see normalize_text) with pyarrow.compute kernels"""
+    if isinstance(array, pa.ChunkedArray):
+        return pa.chunked_array([normalize_arrow(chunk) for chunk in array.chunks], type=array.type)
+
+    array = _apply_where(array, ARROW_REMOVE_PATTERN, _remove_chars)
+    # Alef/yeh/teh marbuta variants occur in most rows, so these passes run on everything
+    for pattern, replacement in ARROW_MAP_PATTERNS:
+        array = pc.replace_substring_regex(array, pattern, replacement)
+    array = _apply_where(array, ARROW_REPEATED_PUNCTUATION, _collapse_punctuation)
+    return _apply_where(array, ARROW_UNTIDY_WHITESPACE, _squeeze_whitespace)
+
+def add_normalized_column(df, column="text", normalized_column="text_normalized"):
+    """Add a normalized copy of `column` to a DataFrame, keeping the raw column"""
+    df[normalized_column] = normalize_series(df[column])
+    return df
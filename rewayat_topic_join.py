@@ -0,0 +1,129 @@
+import os
+import io
+import glob
+import json
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pj
+import pyarrow.parquet as pq
+
+DIALOGUE_DIR = "data_rewayat_jsonl"  # written by build_jsonl_data
+ANNOTATION_DIR = "output_data/gpt-oss-120b"  # rewayat_annotation.output_dir() for its default model; pass output_dir() for others
+
+def _strip_jsonl(file_id):
+    """rewayat_annotation stores the dialogue file name ("<hash>.jsonl") as file_id"""
+    return file_id[:-len(".jsonl")] if file_id.endswith(".jsonl") else file_id
+
+def load_annotations(annotation_dir=ANNOTATION_DIR):
+    """
+    Load topic splits into a pyarrow Table (file_id, split_id, topic, line_ids)
+
+    The model returns line_ids either as a comma-separated string or as a JSON list,
+    and split_id as a string or a number, so rows are coerced here before building
+    the table. split_id is replaced by the position of the split in its file.
+    """
+    columns = {"file_id": [], "split_id": [], "topic": [], "line_ids": []}
+    for path in sorted(glob.glob(os.path.join(annotation_dir, "*.jsonl"))):
+        with open(path, "r", encoding="utf-8") as f:
+            splits = [json.loads(line) for line in f if line.strip()]
+        for split_id, split in enumerate(splits):
+            line_ids = split.get("line_ids", "")
+            if isinstance(line_ids, list):
+                line_ids = ",".join(str(line_id) for line_id in line_ids)
+            columns["file_id"].append(_strip_jsonl(split.get("file_id", os.path.basename(path))))
+            columns["split_id"].append(split_id)
+            columns["topic"].append(str(split.get("topic", "")))
+            columns["line_ids"].append(str(line_ids))
+
+    return pa.table(columns, schema=pa.schema([
+        ("file_id", pa.string()), ("split_id", pa.int32()), ("topic", pa.string()), ("line_ids", pa.string()),
+    ]))
+
+def load_dialogues(file_ids, dialogue_dir=DIALOGUE_DIR):
+    """
+    Load the dialogue lines of the given files into one pyarrow Table (file_id, line_id, speaker, text)
+
+    The JSONL files are concatenated into a single buffer and parsed with one
+    pyarrow.json call instead of one parse per file.
+    """
+    buffer = io.BytesIO()
+    for file_id in sorted(set(file_ids)):
+        path = os.path.join(dialogue_dir, f"{file_id}.jsonl")
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            content = f.read()
+        buffer.write(content)
+        if content and not content.endswith(b"\n"):
+            buffer.write(b"\n")
+
+    schema = pa.schema([("line_id", pa.int64()), ("file_id", pa.string()), ("speaker", pa.string()), ("text", pa.string())])
+    if not buffer.tell():
+        return schema.empty_table()
+    buffer.seek(0)
+    return pj.read_json(buffer, parse_options=pj.ParseOptions(explicit_schema=schema))
+
+def explode_line_ids(annotations):
+    """
+    Turn one row per topic split into one row per (file_id, line_id)
+
+    `line_ids` is split on commas with a vectorized kernel; entries that are not
+    plain integers (e.g. ranges or stray words from the model) are dropped.
+    """
+    parts = pc.split_pattern_regex(annotations["line_ids"].combine_chunks(), r"\s*,\s*")
+    flat = pc.utf8_trim_whitespace(parts.flatten())
+    parent = pc.list_parent_indices(parts)
+    # Position of each line id within its split, to keep the model's ordering after the join
+    starts = pc.take(parts.offsets.slice(0, len(parts)).cast(pa.int64()), parent)
+    position = pc.subtract(pa.array(range(len(flat)), type=pa.int64()), starts)
+    valid = pc.match_substring_regex(flat, r"^[0-9]+$")
+
+    exploded = pa.table({
+        "file_id": pc.take(annotations["file_id"], parent),
+        "split_id": pc.take(annotations["split_id"], parent),
+        "topic": pc.take(annotations["topic"], parent),
+        "position": position,
+        "line_id": flat,
+    }).filter(valid)
+    return exploded.set_column(4, "line_id", pc.cast(exploded["line_id"], pa.int64()))
+
+def join_topic_fragments(annotations, dialogues):
+    """
+    Join topic splits with their dialogue lines and group them into topic fragments
+
+    Args:
+        annotations (pa.Table): Output of load_annotations
+        dialogues (pa.Table): Output of load_dialogues
+
+    Returns:
+        pa.Table: One row per topic fragment with file_id, split_id, topic, line_ids,
+            speakers, texts (lists in model order), dialogue ("speaker: text" lines)
+            and num_lines
+    """
+    lines = explode_line_ids(annotations).join(dialogues, keys=["file_id", "line_id"], join_type="inner")
+    lines = lines.append_column("line", pc.binary_join_element_wise(lines["speaker"], lines["text"], ": "))
+    # The hash join does not preserve order; group_by(use_threads=False) keeps the sorted order within groups
+    lines = lines.sort_by([("file_id", "ascending"), ("split_id", "ascending"), ("position", "ascending")])
+
+    fragments = lines.group_by(["file_id", "split_id", "topic"], use_threads=False).aggregate([
+        ("line_id", "list"), ("speaker", "list"), ("text", "list"), ("line", "list"),
+    ])
+    renames = {"line_id_list": "line_ids", "speaker_list": "speakers", "text_list": "texts", "line_list": "dialogue"}
+    fragments = fragments.rename_columns([renames.get(name, name) for name in fragments.column_names])
+    fragments = fragments.set_column(
+        fragments.schema.get_field_index("dialogue"), "dialogue", pc.binary_join(fragments["dialogue"], "\n")
+    )
+    fragments = fragments.append_column("num_lines", pc.list_value_length(fragments["line_ids"]))
+    return fragments.sort_by([("file_id", "ascending"), ("split_id", "ascending")])
+
+def build_topic_table(annotation_dir=ANNOTATION_DIR, dialogue_dir=DIALOGUE_DIR):
+    """Load annotations and their dialogues and return the joined topic fragments"""
+    annotations = load_annotations(annotation_dir)
+    dialogues = load_dialogues(annotations["file_id"].to_pylist(), dialogue_dir)
+    fragments = join_topic_fragments(annotations, dialogues)
+    print(f"Joined {annotations.num_rows} topic splits with {dialogues.num_rows} dialogue lines into {fragments.num_rows} fragments")
+    return fragments
+
+if __name__ == "__main__":
+    fragments = build_topic_table()
+    pq.write_table(fragments, "rewayat_topics.parquet")
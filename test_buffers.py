@@ -0,0 +1,48 @@
+import io
+import json
+import pandas as pd
+from rewayat_buffers import SectionBuffer, TextBuffer
+
+# Dialogue lines as (speaker, text), including quotes, tabs and newlines that need escaping
+lines = [
+    ("دك محمد", "الي اعرفه انه لج سياره صح"),
+    ("اماني", "صح"),
+    ("دك محمد", 'قال لي "تعال" بس\tما رحت'),
+    ("اماني", "ودي بس الوالده\nالله يحفظها تقول لا"),
+    ("ضاري", ""),
+]
+
+buffer = SectionBuffer("a1b2c3d4")
+for speaker, text in lines:
+    buffer.append(speaker, text)
+
+# Former build_jsonl_data output: one json.dumps per per-line dict
+expected_jsonl = "".join(
+    json.dumps({"line_id": line_id, "file_id": "a1b2c3d4", "speaker": speaker, "text": text}) + "\n"
+    for line_id, (speaker, text) in enumerate(lines)
+)
+out = io.StringIO()
+buffer.write_jsonl(out)
+print("JSONL identical to per-line dicts:", out.getvalue() == expected_jsonl)
+
+# Former rewayat_hf_preprocessing output: a one-column DataFrame written with pandas
+texts = TextBuffer()
+for _, text in lines:
+    texts.append(text)
+expected_tsv = io.StringIO()
+pd.DataFrame([text for _, text in lines], columns=["text"]).to_csv(expected_tsv, index=False, sep='\t', quoting=1)
+out = io.StringIO()
+texts.write_tsv(out)
+print("TSV identical to pandas to_csv:", out.getvalue() == expected_tsv.getvalue())
+
+out = io.StringIO()
+buffer.write_tsv(out)
+print("Section TSV round-trips:", pd.read_csv(io.StringIO(out.getvalue()), sep="\t", keep_default_na=False)["text"].tolist() == [text for _, text in lines])
+
+table = buffer.to_arrow()
+print("Arrow schema:", table.schema.types)
+print("Arrow rows match:", table.to_pylist() == [
+    {"line_id": line_id, "file_id": "a1b2c3d4", "speaker": speaker, "text": text}
+    for line_id, (speaker, text) in enumerate(lines)
+])
+print("Interned speakers:", buffer.speakers)
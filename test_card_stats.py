@@ -0,0 +1,36 @@
+import pyarrow as pa
+from rewayat_card_stats import compute_stats, format_stats_markdown, size_category
+
+# Dialogue lines in the shape written by build_jsonl_data
+batch = pa.record_batch({
+    "text": [
+        "شلونك؟ زين، الحمد لله.",  # Gulf markers, two punctuation groups
+        "لماذا تأخرت؟",  # MSA marker, one punctuation group
+        "ابي اروح الحين!!",  # Gulf markers, adjacent punctuation counts once
+        "Hello there. How are you?",  # Latin punctuation only
+    ],
+    "speaker": ["اماني", "دك محمد", "اماني", "ضاري"],
+    "source_file": ["a.tsv", "a.tsv", "b.tsv", "b.tsv"],
+})
+
+# The same batch fed twice as train and once as validation
+stats = compute_stats({"train": [batch, batch], "validation": [batch]})
+
+print("Per-split rows:", {split: s["num_rows"] for split, s in stats["splits"].items()})
+print("Total rows:", stats["total"]["num_rows"])
+print("Multiple punctuation rows (expect 6):", stats["total"]["multiple_punctuation"])
+print("Arabic punctuation rows (expect 6):", stats["total"]["arabic_punctuation"])
+print("Gulf marker rows (expect 6):", stats["total"]["gulf_markers"])
+print("MSA marker rows (expect 3):", stats["total"]["msa_markers"])
+print("Speakers:", stats["total"]["speakers"].most_common())
+print("Length histogram:", stats["total"]["text_length_histogram"].tolist())
+
+for n in [0, 999, 1000, 54_321, 2_500_000, 3_000_000_000, 2_000_000_000_000]:
+    print(f"size_category({n}) -> {size_category(n)}")
+
+print()
+print(format_stats_markdown(stats))
+
+# The published default config has text and source_file only
+no_speakers = compute_stats({"train": [batch.drop_columns(["speaker"])]})
+print("\n".join(line for line in format_stats_markdown(no_speakers).splitlines() if "peaker" in line))
@@ -0,0 +1,159 @@
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from langchain_core.messages import HumanMessage
+from rewayat_endpoint_pool import EndpointPool
+
+ANSWER = [{"split_id": "1", "topic": "السيارة", "line_ids": "0,1"}]
+
+def make_handler(behaviour):
+    """Stand-in for a vLLM OpenAI server: behaviour["mode"] is "ok", "slow", "broken" or "bad_request" """
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            try:
+                self.wfile.write(payload)
+            except BrokenPipeError:
+                pass  # the client gave up on a slow reply
+
+        def do_GET(self):
+            if behaviour["mode"] == "broken":
+                return self._reply(500, {"error": "down"})
+            self._reply(200, {"object": "list", "data": [{"id": "openai/gpt-oss-120b", "object": "model"}]})
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            behaviour["requests"] += 1
+            if behaviour["mode"] == "broken":
+                return self._reply(500, {"error": "down"})
+            if behaviour["mode"] == "bad_request":
+                return self._reply(400, {"error": {"message": "maximum context length is 131072 tokens", "type": "BadRequestError"}})
+            if behaviour["mode"] == "slow":
+                time.sleep(1.5)
+            self._reply(200, {
+                "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": "openai/gpt-oss-120b",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": json.dumps(ANSWER, ensure_ascii=False)}}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            })
+
+    return Handler
+
+def start_server(mode):
+    behaviour = {"mode": mode, "requests": 0}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(behaviour))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, behaviour
+
+servers = {mode: start_server(mode) for mode in ["ok", "ok2", "slow", "broken"]}
+servers["ok2"][1]["mode"] = "ok"
+base_urls = {mode: f"http://127.0.0.1:{server.server_port}/v1" for mode, (server, _) in servers.items()}
+
+# Requests slower than 1s time out; health checks are triggered by hand below
+pool = EndpointPool(list(base_urls.values()), model="openai/gpt-oss-120b", api_key="EMPTY",
+                    health_check_interval=None, request_timeout=1.0)
+
+def send(i):
+    response = pool.invoke([HumanMessage(content=f"request {i}")])
+    return response.content
+
+with ThreadPoolExecutor(max_workers=6) as executor:
+    answers = list(executor.map(send, range(40)))
+
+print("All answers parsed:", all(json.loads(answer) == ANSWER for answer in answers))
+print("Requests received per server:", {mode: behaviour["requests"] for mode, (_, behaviour) in servers.items()})
+now = time.monotonic()
+for mode, endpoint in zip(base_urls, pool.endpoints):
+    print(f"{mode:<7} completed={endpoint.completed:3d} ejected={not endpoint.is_available(now)}")
+
+print("\nHealth check:", pool.check_health())
+servers["broken"][1]["mode"] = "ok"
+print("Health check after the broken server recovers:", pool.check_health())
+print("broken server available again:", pool.endpoints[3].is_available(time.monotonic()))
+
+pool.close()
+for server, _ in servers.values():
+    server.shutdown()
+
+# A busy endpoint: its only request connection is in use while the health check runs.
+# The probe timeout is shorter than the request, as for a long generation in production
+import rewayat_endpoint_pool
+rewayat_endpoint_pool.HEALTH_CHECK_TIMEOUT = 0.5
+slow_server, _ = start_server("slow")
+busy_pool = EndpointPool([f"http://127.0.0.1:{slow_server.server_port}/v1"], model="openai/gpt-oss-120b", api_key="EMPTY",
+                         health_check_interval=None, request_timeout=5.0, max_connections=1)
+with ThreadPoolExecutor(max_workers=1) as executor:
+    in_flight = executor.submit(busy_pool.invoke, [HumanMessage(content="long request")])
+    time.sleep(0.3)
+    start = time.monotonic()
+    print("\nHealth check while busy:", list(busy_pool.check_health().values()), f"in {time.monotonic() - start:.1f}s")
+    print("Busy endpoint still available:", busy_pool.endpoints[0].is_available(time.monotonic()))
+    print("In-flight request answered:", json.loads(in_flight.result().content) == ANSWER)
+busy_pool.close()
+slow_server.shutdown()
+
+# A 400 (e.g. prompt over the context length) would fail on every replica: no failover, no failure count
+bad_server, bad_behaviour = start_server("bad_request")
+ok_server, ok_behaviour = start_server("ok")
+client_error_pool = EndpointPool(
+    [f"http://127.0.0.1:{server.server_port}/v1" for server in (bad_server, ok_server)],
+    model="openai/gpt-oss-120b", api_key="EMPTY", health_check_interval=None,
+)
+for i in range(3):
+    try:
+        client_error_pool.invoke([HumanMessage(content=f"long prompt {i}")])
+    except Exception as e:
+        error = e
+print("\n400 raised as:", type(error).__name__)
+print("Requests per server (expect 3, 0):", bad_behaviour["requests"], ok_behaviour["requests"])
+print("Failures counted:", [endpoint.failures for endpoint in client_error_pool.endpoints])
+print("Ejected:", [not endpoint.is_available(time.monotonic()) for endpoint in client_error_pool.endpoints])
+client_error_pool.close()
+bad_server.shutdown()
+ok_server.shutdown()
+
+# Latency is compared per output token and must stay high for several requests
+latency_pool = EndpointPool(["http://127.0.0.1:9/v1", "http://127.0.0.1:10/v1"], model="openai/gpt-oss-120b",
+                            api_key="EMPTY", health_check_interval=None)
+fast, other = latency_pool.endpoints
+for _ in range(5):
+    for endpoint in (fast, other):
+        latency_pool.release(latency_pool.acquire(exclude=[e for e in latency_pool.endpoints if e is not endpoint]),
+                             elapsed=2.0, output_tokens=100)
+latency_pool.release(latency_pool.acquire(exclude=[other]), elapsed=20.0, output_tokens=1000)
+print("\nEjected after one 10x longer generation:", not fast.is_available(time.monotonic()))
+latency_pool.release(latency_pool.acquire(exclude=[other]), elapsed=20.0, output_tokens=100)
+print("Ejected after one slow request:", not fast.is_available(time.monotonic()))
+for _ in range(2):
+    latency_pool.release(latency_pool.acquire(exclude=[other]), elapsed=20.0, output_tokens=100)
+print("Ejected after three slow requests in a row:", not fast.is_available(time.monotonic()))
+latency_pool.close()
+
+# Threads of an ejected replica queue on a busy one: waiting for its connection is not a failure
+busy_server, busy_behaviour = start_server("slow")
+spare_server, spare_behaviour = start_server("ok")
+queue_pool = EndpointPool(
+    [f"http://127.0.0.1:{server.server_port}/v1" for server in (busy_server, spare_server)],
+    model="openai/gpt-oss-120b", api_key="EMPTY", health_check_interval=None, request_timeout=2.0, max_connections=1,
+)
+busy, spare = queue_pool.endpoints
+spare.ejected_until = time.monotonic() + 60  # every request is routed to the busy endpoint first
+with ThreadPoolExecutor(max_workers=4) as executor:
+    # The third and fourth requests would wait 3s for the single connection and hit the 2s pool timeout
+    answers = list(executor.map(lambda i: queue_pool.invoke([HumanMessage(content=f"queued {i}")]).content, range(4)))
+print("\nQueued requests answered:", all(json.loads(answer) == ANSWER for answer in answers))
+print("Requests per server (expect 2, 2):", busy_behaviour["requests"], spare_behaviour["requests"])
+print("Busy endpoint ejected (expect False):", not busy.is_available(time.monotonic()))
+queue_pool.close()
+busy_server.shutdown()
+spare_server.shutdown()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import pyarrow as pa
+from rewayat_hub_export import export_parquet_shards, load_manifest, prune_configs, upload_shards, LocalDirTarget
+
+def make_split(num_files, rows_per_file=50):
+    """Build a split table with `num_files` source files of dialogue lines"""
+    texts, sources = [], []
+    for file_idx in range(num_files):
+        for row in range(rows_per_file):
+            texts.append(f"شلونك يا {file_idx}؟ زين، الحمد لله {row}.")
+            sources.append(f"novel_{file_idx:04d}.tsv")
+    return pa.table({"text": texts, "source_file": sources})
+
+with tempfile.TemporaryDirectory() as tmp:
+    staging_dir = os.path.join(tmp, "staging")
+    target = LocalDirTarget(os.path.join(tmp, "remote"))
+
+    # Small target size so the corpus is cut into many shards
+    corpus = {"train": make_split(400), "validation": make_split(4)}
+    manifest = export_parquet_shards(corpus, staging_dir, target_shard_bytes=64 * 1024)
+    print(f"Shards exported: {len(manifest['shards'])}")
+
+    print("First publish:", upload_shards(staging_dir, target))
+    print("Republish of the same corpus (expect 0 uploaded):", upload_shards(staging_dir, target))
+
+    # Simulate an interrupted upload: one shard never reached the target
+    missing = sorted(os.listdir(os.path.join(target.root, "data")))[0]
+    os.remove(os.path.join(target.root, "data", missing))
+    print("Resume after losing one shard (expect 1 uploaded):", upload_shards(staging_dir, target))
+
+    # Grow the corpus by a few novels: only the shards they land in should change
+    corpus = {"train": make_split(405), "validation": make_split(4)}
+    export_parquet_shards(corpus, staging_dir, target_shard_bytes=64 * 1024)
+    print("Publish of a slightly grown corpus:", upload_shards(staging_dir, target))
+
+    # A run with an extra config, then a run without it: its shards must not linger
+    topics = pa.table({"file_id": [f"f{i}" for i in range(20)], "topic": ["السيارة"] * 20})
+    export_parquet_shards({"train": topics}, staging_dir, key="file_id", config_name="topics")
+    print("Publish with a topics config:", upload_shards(staging_dir, target))
+    prune_configs(staging_dir, {"default"})
+    print("Configs left in the manifest:", sorted({entry["config"] for entry in load_manifest(staging_dir)["shards"].values()}))
+    print("topics/ left in staging:", os.path.exists(os.path.join(staging_dir, "topics")))
+    print("Publish without it (expect its shard deleted):", upload_shards(staging_dir, target))
+
+with tempfile.TemporaryDirectory() as tmp:
+    # A hash-based split can leave validation empty; it must not become a zero-row shard
+    manifest = export_parquet_shards({"train": make_split(3), "validation": make_split(0)}, os.path.join(tmp, "staging"))
+    print("Splits in the manifest (expect train only):", sorted({entry["split"] for entry in manifest["shards"].values()}))
+    manifest = export_parquet_shards({"train": make_split(0)}, os.path.join(tmp, "staging"), config_name="topics")
+    print("Configs in the manifest (expect default only):", sorted({entry["config"] for entry in manifest["shards"].values()}))
+
+class ListingApi:
+    """Stand-in for HfApi.list_repo_tree that raises a given error"""
+
+    def __init__(self, error):
+        self.error = error
+
+    def list_repo_tree(self, *args, **kwargs):
+        raise self.error
+
+from huggingface_hub.utils import EntryNotFoundError
+from rewayat_hub_export import HubTarget
+
+hub_target = object.__new__(HubTarget)  # skip create_repo, no network needed
+hub_target.repo_id = "user/rewayat"
+hub_target.api = ListingApi(EntryNotFoundError("404 Client Error: Entry Not Found"))
+print("Empty repo lists no shards:", hub_target.remote_hashes())
+hub_target.api = ListingApi(ConnectionError("Temporary failure in name resolution"))
+try:
+    hub_target.remote_hashes()
+    print("Listing failure swallowed (unexpected)")
+except ConnectionError as e:
+    print("Listing failure propagates:", e)
@@ -0,0 +1,48 @@
+import os
+import tempfile
+from rewayat_buffers import SectionBuffer
+from rewayat_index import RewayatIndex, build_index, sample_lines, tokenize, unpack_lines, write_index_part
+
+# Two novels' sections, as build_jsonl_data would have written them
+sections = {
+    "novel_a": [("a1b2c3d4", [("دك محمد", "الي اعرفه انه لج سيارة صح"), ("أماني", "صح، سيارتي جديدة"), ("دك محمد", "روحي لسوق السمك")])],
+    "novel_b": [("e5f6a7b8", [("اماني", "ودي أروح لسوق السمك"), ("ضاري", "انت من جدك تبي تقتلني؟"), ("طلال", "السمك؟ لسوق الجمعة، لا لا")])],
+}
+
+print("tokenize:", tokenize("أنا، روحي لسوق السمك!! 12 وأنا hello"))
+
+with tempfile.TemporaryDirectory() as tmp:
+    dialogue_dir = os.path.join(tmp, "data_rewayat_jsonl")
+    os.makedirs(dialogue_dir)
+    for novel, novel_sections in sections.items():
+        buffers = []
+        for file_id, lines in novel_sections:
+            buffer = SectionBuffer(file_id)
+            for speaker, text in lines:
+                buffer.append(speaker, text)
+            with open(os.path.join(dialogue_dir, f"{file_id}.jsonl"), "w") as f:
+                buffer.write_jsonl(f)
+            buffers.append(buffer)
+        write_index_part(buffers, novel, os.path.join(tmp, "parts"))
+
+    build_index(os.path.join(tmp, "parts"), os.path.join(tmp, "index"))
+    index = RewayatIndex(os.path.join(tmp, "index"), dialogue_dir)
+
+    def show(lines):
+        return sorted((index.file_id(file_idx), line_id) for file_idx, line_id in unpack_lines(lines))
+
+    print("speaker 'اماني' (expect both spellings):", show(index.speaker_lines("اماني")))
+    print("speaker 'دك محمد':", show(index.speaker_lines("دك محمد")))
+    print("token 'سيارة':", show(index.token_lines("سيارة")))
+    print("phrase 'لسوق السمك' (expect 2 lines, not the reversed one):", show(index.token_lines("لسوق السمك")))
+    print("phrase 'السمك لسوق':", show(index.token_lines("السمك لسوق")))
+    print("phrase 'لا لا' (repeated token):", show(index.token_lines("لا لا")))
+    print("phrase 'روحي السمك' (tokens present but not adjacent, expect none):", show(index.token_lines("روحي السمك")))
+    print("token 'موجود' (expect none):", show(index.token_lines("موجود")))
+
+    print("counts speaker 'اماني':", index.counts("speaker", "اماني"))
+    print("counts tokens 'لسوق السمك':", index.counts("token", "لسوق السمك"))
+    print("sample of 1 speaker line:", len(sample_lines(index.speaker_lines("دك محمد"), 1)))
+
+    file_idx, line_id = unpack_lines(index.token_lines("سيارتي"))[0]
+    print("context of سيارتي:", [(record["line_id"], record["speaker"]) for record in index.context(file_idx, line_id)])
@@ -0,0 +1,28 @@
+import pandas as pd
+import pyarrow as pa
+from rewayat_normalization import normalize_text, normalize_series, normalize_arrow
+
+# (raw text, expected normalized text)
+test_cases = [
+    ("مرحبا بالعالم", "مرحبا بالعالم"),  # Nothing to do
+    ("مـــرحـبـا", "مرحبا"),  # Tatweel
+    ("مَرْحَبًا بِكُمْ", "مرحبا بكم"),  # Diacritics
+    ("أنا إبراهيم آسف", "انا ابراهيم اسف"),  # Alef forms
+    ("على مدرسة", "علي مدرسه"),  # Alef maqsura and teh marbuta
+    ("شلون‌ك‏؟", "شلونك؟"),  # Zero-width non-joiner and RLM
+    ("صح!!! ليش؟؟", "صح! ليش؟"),  # Repeated punctuation
+    ("صح!؟", "صح!؟"),  # Mixed punctuation runs are kept
+    ("  زين   الحين\n ", "زين الحين"),  # Whitespace
+]
+
+print("Testing normalize_text / normalize_series / normalize_arrow:")
+print("=" * 50)
+
+raw = [text for text, _ in test_cases]
+series_result = normalize_series(pd.Series(raw)).tolist()
+arrow_result = normalize_arrow(pa.array(raw)).to_pylist()
+
+for i, ((text, expected), from_series, from_arrow) in enumerate(zip(test_cases, series_result, arrow_result), 1):
+    result = normalize_text(text)
+    status = "✓" if result == expected == from_series == from_arrow else "✗"
+    print(f"{i:2d}. {status} {text!r} -> {result!r}")
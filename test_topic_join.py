@@ -0,0 +1,28 @@
+import pyarrow as pa
+from rewayat_topic_join import explode_line_ids, join_topic_fragments
+
+# Dialogue lines in the shape written by build_jsonl_data
+dialogues = pa.table({
+    "line_id": [0, 1, 2, 3, 4, 0, 1],
+    "file_id": ["a1b2c3d4"] * 5 + ["e5f6a7b8"] * 2,
+    "speaker": ["دك محمد", "اماني", "دك محمد", "اماني", "دك محمد", "ضاري", "طلال"],
+    "text": ["الي اعرفه انه لج سياره صح", "صح", "انتي روحي لسوق السمك", "ودي بس الوالده تقول لا", "يلا سلام",
+             "انت من جدك تبي تقتلني", "انا كنت حاس"],
+})
+
+# Topic splits as loaded by load_annotations (line_ids as returned by the model)
+annotations = pa.table({
+    "file_id": ["a1b2c3d4", "a1b2c3d4", "e5f6a7b8"],
+    "split_id": pa.array([0, 1, 0], type=pa.int32()),
+    "topic": ["السيارة", "سوق السمك", "الخلاف"],
+    "line_ids": ["0, 1", "3,2,4", "0,1,7,x"],  # out-of-order ids, a missing line and a stray token
+})
+
+print("Exploded line ids:")
+print(explode_line_ids(annotations).to_pylist())
+
+print("\nTopic fragments:")
+for fragment in join_topic_fragments(annotations, dialogues).to_pylist():
+    print(f"{fragment['file_id']} #{fragment['split_id']} [{fragment['topic']}] line_ids={fragment['line_ids']} num_lines={fragment['num_lines']}")
+    print(fragment["dialogue"])
+    print("---")